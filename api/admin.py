@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Article, User  # Adjust the import if the model is in a different file
+from .models import Article, RetrainingJob, User  # Adjust the import if the model is in a different file
 from django.contrib.auth.admin import UserAdmin
 
 class CustomUserAdmin(UserAdmin):
@@ -21,4 +21,10 @@ class CustomUserAdmin(UserAdmin):
     ordering = ("email",)
 
 admin.site.register(User, CustomUserAdmin)  # ✅ Register User
-admin.site.register(Article)  # ✅ Register Article
\ No newline at end of file
+admin.site.register(Article)  # ✅ Register Article
+
+@admin.register(RetrainingJob)
+class RetrainingJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "trigger_count", "requested_at", "started_at", "finished_at", "return_code")
+    list_filter = ("status",)
+    readonly_fields = [f.name for f in RetrainingJob._meta.fields]
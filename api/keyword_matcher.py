@@ -0,0 +1,95 @@
+"""
+Aho–Corasick multi-pattern matcher over word sequences.
+
+Phrases are compiled into one automaton whose failure links are folded into a full
+transition table, so a scan is a single pass with one dict lookup per word, however
+many phrases there are. Substring terms (matched inside words) are resolved once per
+distinct word and memoized.
+"""
+import hashlib
+from collections import deque
+from typing import Callable, Iterable, Sequence, Tuple
+
+MAX_MEMO = 100_000  # distinct words remembered for substring terms
+MAX_TEXT_MEMO = 20_000  # texts whose flags scan_text() remembers, by digest (~150 bytes each)
+
+
+class KeywordMatcher:
+    def __init__(self, phrases: Iterable[Tuple[Sequence[str], int]] = (), substrings: Iterable[Tuple[str, int]] = ()):
+        """
+        phrases: (words, flag) pairs, matched as consecutive whole words.
+        substrings: (term, flag) pairs, matched anywhere inside a word.
+        scan() ORs together the flags of everything found.
+        """
+        goto = [{}]
+        out = [0]
+        for words, flag in phrases:
+            if not words:
+                continue
+            node = 0
+            for word in words:
+                nxt = goto[node].get(word)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][word] = nxt
+                    goto.append({})
+                    out.append(0)
+                node = nxt
+            out[node] |= flag
+
+        # Breadth-first, so a node's failure target is finished before the node itself
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            out[node] |= out[fail[node]]
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            for word, nxt in goto[node].items():
+                fail[nxt] = delta[fail[node]].get(word, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = out
+        self._substrings = tuple(substrings)
+        self._word_flags = {}
+        self._text_flags = {}
+
+    def _flags_in(self, word: str) -> int:
+        flags = 0
+        for term, flag in self._substrings:
+            if term in word:
+                flags |= flag
+        if len(self._word_flags) >= MAX_MEMO:
+            self._word_flags.clear()
+        self._word_flags[word] = flags
+        return flags
+
+    def scan(self, words: Sequence[str]) -> int:
+        """Flags of all phrases and substring terms occurring in words."""
+        delta, out = self._delta, self._out
+        word_flags = self._word_flags
+        node = 0
+        found = 0
+        for word in words:
+            node = delta[node].get(word, 0)
+            flags = word_flags.get(word)
+            if flags is None:
+                flags = self._flags_in(word)
+            found |= out[node] | flags
+        return found
+
+    def scan_text(self, text: str, tokenize: Callable[[str], Sequence[str]]) -> int:
+        """
+        scan(tokenize(text)), remembered per text: the same articles are scored over and over.
+        Keyed by a 16-byte digest, so the memo never holds on to article bodies.
+        """
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        flags = self._text_flags.get(key)
+        if flags is None:
+            flags = self.scan(tokenize(text))
+            if len(self._text_flags) >= MAX_TEXT_MEMO:
+                self._text_flags.clear()
+            self._text_flags[key] = flags
+        return flags
@@ -0,0 +1,17 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Shows cache hits, misses and hit rate per key namespace across all workers."
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, "deployment_stats"):
+            self.stdout.write(self.style.WARNING("⚠️ The configured cache backend keeps no metrics"))
+            return
+        stats = cache.deployment_stats()
+        if not stats:
+            self.stdout.write("No cache reads recorded yet")
+        for namespace, counts in stats.items():
+            rate = "-" if counts["hit_rate"] is None else f"{counts['hit_rate']:.1%}"
+            self.stdout.write(f"{namespace:<24} hits {counts['hits']:>8}  misses {counts['misses']:>8}  hit rate {rate}")
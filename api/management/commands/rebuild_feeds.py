@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.utils.feed_store import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized personalized feeds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-only", action="store_true", help="Only rebuild feeds marked stale or missing.")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options["stale_only"]:
+            users = users.exclude(materialized_feed__stale=False)
+        rebuilt = rebuild_feeds(users)
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {rebuilt} feed(s)"))
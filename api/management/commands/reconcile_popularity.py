@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.popularity import reconcile_popularity
+
+
+class Command(BaseCommand):
+    help = "Recomputes exact interaction counters and popularityScore for every article."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = reconcile_popularity(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Reconciled popularity for {updated} article(s)"))
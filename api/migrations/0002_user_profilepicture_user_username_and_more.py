@@ -0,0 +1,178 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+import api.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_user_names(apps, schema_editor):
+    # userName is unique, so existing users each get their own guest name
+    User = apps.get_model("api", "User")
+    for user in User.objects.filter(userName__isnull=True).only("id"):
+        user.userName = api.models.generate_unique_guest_username()
+        user.save(update_fields=["userName"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profilePicture",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="profile_picture/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="userName",
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(fill_user_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="user",
+            name="userName",
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="privacySettings",
+            field=models.JSONField(default=api.models.default_privacy),
+        ),
+        migrations.CreateModel(
+            name="ArticleInteraction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("view", "Viewed"),
+                            ("like", "Liked"),
+                            ("click", "Clicked"),
+                            ("share", "Shared"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("time_spent", models.FloatField(blank=True, null=True)),
+                ("timestamp", models.DateTimeField(auto_now_add=True)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.article"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FriendRequest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("accepted", "Accepted"),
+                            ("rejected", "Rejected"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "from_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sent_requests",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "to_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="received_requests",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("from_user", "to_user")},
+            },
+        ),
+        migrations.CreateModel(
+            name="UserArticleScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("most", "Most"),
+                            ("high", "High"),
+                            ("medium", "Medium"),
+                            ("low", "Low"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.article"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "article")},
+            },
+        ),
+    ]
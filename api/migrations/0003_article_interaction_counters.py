@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from api.utils.popularity import reconcile_popularity
+
+    # Stored popularityScore values are kept: as before, an article's score is only
+    # re-derived from its interactions when it gets a new one
+    reconcile_popularity(apps=apps, scores=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_user_profilepicture_user_username_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="viewCount",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="likeCount",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="clickCount",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="shareCount",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_article_interaction_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoringCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_interaction_at", models.DateTimeField(blank=True, null=True)),
+                ("last_article_id", models.BigIntegerField(default=0)),
+                ("last_user_id", models.BigIntegerField(default=0)),
+                ("last_run_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "dirty_articles",
+                    models.ManyToManyField(
+                        blank=True, related_name="+", to="api.article"
+                    ),
+                ),
+                (
+                    "dirty_users",
+                    models.ManyToManyField(
+                        blank=True, related_name="+", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_scoringcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetrainingJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                ("trigger_count", models.PositiveIntegerField(default=1)),
+                ("requested_at", models.DateTimeField(auto_now_add=True)),
+                ("not_before", models.DateTimeField()),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("worker_pid", models.IntegerField(blank=True, null=True)),
+                ("return_code", models.IntegerField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status", "queued")),
+                        fields=("status",),
+                        name="single_queued_retraining_job",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("status", "running")),
+                        fields=("status",),
+                        name="single_running_retraining_job",
+                    ),
+                ],
+            },
+        ),
+    ]
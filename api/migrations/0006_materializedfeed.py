@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_retrainingjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MaterializedFeed",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entries", models.JSONField(default=list)),
+                ("stale", models.BooleanField(default=False)),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="materialized_feed",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
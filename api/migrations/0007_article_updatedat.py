@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_materializedfeed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="updatedAt",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_article_updatedat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="materializedfeed",
+            name="generation",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="FeedGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:22
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_materializedfeed_generation_feedgeneration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RankedSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("scope", models.CharField(max_length=255)),
+                ("entries", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
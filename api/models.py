@@ -25,9 +25,17 @@ class Article(models.Model):
     source = models.CharField(max_length=100, blank=True, null=True)
     location = models.CharField(max_length=100, blank=True, null=True)
     popularityScore = models.IntegerField(default=0)
+    # Interaction counters kept up to date with F() updates, popularityScore is derived from them
+    viewCount = models.PositiveIntegerField(default=0)
+    likeCount = models.PositiveIntegerField(default=0)
+    clickCount = models.PositiveIntegerField(default=0)
+    shareCount = models.PositiveIntegerField(default=0)
     createdAt = models.DateTimeField(null=True, blank=True)
     image = models.ImageField(upload_to="articles/", null=True, blank=True)
     priority = models.TextField(blank=True, null=True)
+    # Set by every save(); versions the cached serializer payload, so QuerySet.update()
+    # callers that change serialized fields must set it too
+    updatedAt = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
@@ -140,3 +148,101 @@ class UserArticleScore(models.Model):
 
     def __str__(self):
         return f"{self.user.userName} - {self.article.title} - {self.priority} ({self.score:.2f})"
+
+class ScoringCheckpoint(models.Model):
+    """
+    High-water marks of the last assign_priority run, used by incremental re-scoring.
+    A single row is kept; users and articles changed since the run are queued in the M2M fields.
+    """
+    last_interaction_at = models.DateTimeField(null=True, blank=True)
+    last_article_id = models.BigIntegerField(default=0)
+    last_user_id = models.BigIntegerField(default=0)
+    dirty_users = models.ManyToManyField(User, related_name="+", blank=True)
+    dirty_articles = models.ManyToManyField(Article, related_name="+", blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def get(cls):
+        checkpoint, _ = cls.objects.get_or_create(pk=1)
+        return checkpoint
+
+    def __str__(self):
+        return f"Scoring checkpoint @ {self.last_interaction_at} (article #{self.last_article_id})"
+
+class RetrainingJob(models.Model):
+    """
+    A run of the article_priorization.py training script.
+    Partial unique constraints keep at most one queued and one running job across all workers.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    trigger_count = models.PositiveIntegerField(default=1)  # triggers coalesced into this job
+    requested_at = models.DateTimeField(auto_now_add=True)
+    not_before = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker_pid = models.IntegerField(null=True, blank=True)
+    return_code = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status'], condition=models.Q(status='queued'), name='single_queued_retraining_job'),
+            models.UniqueConstraint(fields=['status'], condition=models.Q(status='running'), name='single_running_retraining_job'),
+        ]
+
+    def __str__(self):
+        return f"Retraining #{self.pk} - {self.status} ({self.trigger_count} triggers)"
+
+class MaterializedFeed(models.Model):
+    """
+    Precomputed personalized feed: the user's candidate articles with the time-independent
+    part of their scores; recency is applied when the feed is served.
+    Marked stale when the user's scores or the articles change and rebuilt in the background.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="materialized_feed")
+    # [{"id", "articleId", "category", "base", "priority", "createdAt", "publishedAt"}, ...]
+    entries = models.JSONField(default=list)
+    stale = models.BooleanField(default=False)
+    built_at = models.DateTimeField(auto_now=True)
+    # Folded into the cached feed response's key; bumped when anything the response shows changes
+    generation = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Feed of {self.user.userName} ({len(self.entries)} articles{', stale' if self.stale else ''})"
+
+class FeedGeneration(models.Model):
+    """
+    Global counter folded into every cached feed response's key, next to the user's
+    MaterializedFeed.generation; bumped when a change can touch every feed (article edits).
+    A single row is kept.
+    """
+    value = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def get(cls):
+        generation, _ = cls.objects.get_or_create(pk=1)
+        return generation
+
+    def __str__(self):
+        return f"Feed generation {self.value}"
+
+class RankedSnapshot(models.Model):
+    """
+    Ranked candidates behind a pagination cursor (api/utils/ranked_pagination.py), kept
+    in the database so whichever worker serves a later page sees the first page's order.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scope = models.CharField(max_length=255)  # request path and user, a cursor only works there
+    # [{"id", "score", "_pos", ...}, ...] as returned by the view's rank()
+    entries = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Snapshot {self.id} of {self.scope} ({len(self.entries)} entries)"
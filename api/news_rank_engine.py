@@ -0,0 +1,269 @@
+"""
+News ranking engine: source, recency, engagement, geo, severity and trend scores.
+
+Plain Python and NumPy with no FastAPI/pydantic/Django dependency, so it can be
+served by news_rank_service.py or imported by the Django views and run in-process.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, List, Union
+import logging
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from api.keyword_matcher import KeywordMatcher
+from api.trending_topics import trending_topics
+
+# --- Constants ---
+TR_LOCATIONS = {
+    "istanbul", "ankara", "izmir", "bursa", "antalya", "adana", "konya",
+    "trabzon", "gaziantep", "diyarbakır", "kayseri", "mersin", "van",
+    "karabük", "kocaeli", "sakarya", "manisa", "edirne", "rize", "ordu",
+}
+
+HOT_TOPICS = {
+    "deprem", "ekonomi", "siyaset", "enflasyon", "zam",
+    "seçim", "aselsan", "savunma", "yapay zeka", "göçmen", "terör",
+    "iran", "israil", "ukrayna", "abd", "cumhurbaşkanı", "imamoğlu", "erdoğan", "ekrem imamoğlu",
+    "özgür özel", "chp", "akp", "mhp", "dem", "gezi", "kılıçdaroğlu",
+}
+
+SOURCE_WEIGHTS = {
+    "hurriyet": 1.0,
+    "cnn": 1.0,
+    "ntv": 1.0,
+    "sozcu": 1.3,
+    "haberler": 1.1,
+    "milliyet": 1.0,
+    "ensonhaber": 0.9,
+    "tele1": 1.3,
+    "t24": 1.0,
+    "bianet": 1.2,
+    "cumhuriyet": 1.3,
+    "ahaber": -0.5,
+}
+
+SCORE_WEIGHTS = {
+    "source": 0.18,
+    "recency": 0.20,
+    "engagement": 0.20,
+    "geo": 0.17,
+    "severity": 0.15,
+    "trend": 0.10,
+}
+
+# Used when an article has no timestamp, same as the HTTP payload default
+DEFAULT_TIMESTAMP = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# --- Keyword Matching ---
+WORD_RE = re.compile(r"\w+")
+
+GEO = 1
+TREND = 2
+# Matched as plain substrings so Turkish suffixes count ("ölümü", "yaralılar");
+# "ölü" also covers "ölüm"
+SEVERITY_TERMS = (("ölü", 0.4), ("yaralı", 0.2), ("patlama", 0.3))
+SEVERITY_FLAGS = tuple((4 << i, boost) for i, (_, boost) in enumerate(SEVERITY_TERMS))
+
+def normalize(text: str) -> str:
+    return text.lower()
+
+def extract_words(text: str) -> set:
+    return set(WORD_RE.findall(normalize(text)))
+
+def tokenize(text: str) -> list:
+    return WORD_RE.findall(normalize(text))
+
+@lru_cache(maxsize=8)
+def _build_matcher(locations: frozenset, topics: frozenset) -> KeywordMatcher:
+    # Locations and topics (including multi-word ones like "yapay zeka" and trending
+    # titles) match as whole-word phrases, severity terms inside words
+    return KeywordMatcher(
+        phrases=[(tokenize(location), GEO) for location in locations]
+        + [(tokenize(topic), TREND) for topic in topics],
+        substrings=[(term, flag) for (term, _), (flag, _) in zip(SEVERITY_TERMS, SEVERITY_FLAGS)],
+    )
+
+def keyword_matcher(topics: set) -> KeywordMatcher:
+    """Matcher for TR_LOCATIONS, the given topics and SEVERITY_TERMS; built once per distinct topic set."""
+    return _build_matcher(frozenset(TR_LOCATIONS), frozenset(topics))
+
+# --- Feature Functions ---
+def geo_score(text: str) -> float:
+    return 1.2 if keyword_matcher(HOT_TOPICS).scan(tokenize(text)) & GEO else 1.0
+
+def severity_from_flags(found: int) -> float:
+    score = 1.0
+    for flag, boost in SEVERITY_FLAGS:
+        if found & flag: score += boost
+    return min(score, 1.5)
+
+def severity_predict(text: str) -> float:
+    return severity_from_flags(keyword_matcher(HOT_TOPICS).scan(tokenize(text)))
+
+def recency_weight(published: Union[str, datetime]) -> float:
+    try:
+        # Accept ISO strings (HTTP API) as well as datetimes (in-process callers)
+        if not isinstance(published, datetime):
+            published = datetime.fromisoformat(published)
+        # Ensure that the article timestamp is timezone-naive
+        article_time = published.astimezone(timezone.utc).replace(tzinfo=None)
+        # Get the current time as a naive datetime (also in UTC)
+        current_time = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        # Calculate time delta in seconds
+        delta = (current_time - article_time).total_seconds()
+
+        if delta < 3600:  # Less than 1 hour
+            return 1.5
+        elif delta < 86400:  # Less than 24 hours
+            return 1.2
+        elif delta < 3 * 86400:  # Less than 3 days
+            return 1.0
+        else:
+            return 0.8
+    except Exception as e:
+        logging.error(f"Invalid timestamp: {e}")
+        return 1.0
+
+def engagement_score(views: int, likes: int, comments: int) -> float:
+    return min(1.5, 1.0 + 0.00005 * views + 0.01 * likes + 0.02 * comments)
+
+def source_weight(source: str) -> float:
+    return SOURCE_WEIGHTS.get(normalize(source), 1.0)
+
+def hot_topic_score(text: str, hot_topics: set) -> float:
+    return 1.2 if keyword_matcher(hot_topics).scan(tokenize(text)) & TREND else 1.0
+
+def fetch_trending_titles() -> frozenset:
+    # Last good snapshot, refreshed in the background; never waits on the network
+    return trending_topics.get()
+
+# --- Scoring ---
+FEATURES = list(SCORE_WEIGHTS)  # column order of the feature matrix
+WEIGHTS = np.array([SCORE_WEIGHTS[key] for key in FEATURES])
+
+def _timestamp_seconds(published: Union[str, datetime]) -> float:
+    """Epoch seconds, or NaN for an unparseable timestamp (scored as recency 1.0)."""
+    try:
+        if not isinstance(published, datetime):
+            published = datetime.fromisoformat(published)
+        return published.astimezone(timezone.utc).timestamp()
+    except Exception as e:
+        logging.error(f"Invalid timestamp: {e}")
+        return np.nan
+
+def feature_matrix(titles, contents, timestamps, sources, views, likes, comments, topics: set,
+                   remember_texts: bool = True) -> np.ndarray:
+    """
+    One row per article, one column per FEATURES entry.
+    Geo, severity and trend come from a single keyword_matcher() pass over each
+    article's text, remembered per text unless remember_texts is False (one-off texts,
+    e.g. streamed batches); the numeric features are computed column-wise.
+    """
+    n = len(titles)
+    matrix = np.empty((n, len(FEATURES)))
+
+    matcher = keyword_matcher(topics)
+    texts = (f"{title} {content}" for title, content in zip(titles, contents))
+    if remember_texts:
+        found = [matcher.scan_text(text, tokenize) for text in texts]
+    else:
+        found = [matcher.scan(tokenize(text)) for text in texts]
+    geo = np.fromiter((flags & GEO for flags in found), bool, n)
+    trend = np.fromiter((flags & TREND for flags in found), bool, n)
+    # Added in severity_from_flags' order so the floats come out identical
+    severity = np.ones(n)
+    for flag, boost in SEVERITY_FLAGS:
+        severity = severity + boost * np.fromiter((flags & flag for flags in found), bool, n)
+
+    now = datetime.now(timezone.utc).timestamp()
+    delta = now - np.array([_timestamp_seconds(t) for t in timestamps])
+    recency = np.select(
+        [np.isnan(delta), delta < 3600, delta < 86400, delta < 3 * 86400],
+        [1.0, 1.5, 1.2, 1.0],
+        default=0.8,
+    )
+
+    engagement = np.minimum(
+        1.5,
+        1.0 + 0.00005 * np.asarray(views, dtype=float)
+        + 0.01 * np.asarray(likes, dtype=float)
+        + 0.02 * np.asarray(comments, dtype=float),
+    )
+
+    columns = {
+        "source": [source_weight(source) for source in sources],
+        "recency": recency,
+        "engagement": engagement,
+        "geo": np.where(geo, 1.2, 1.0),
+        "severity": np.minimum(severity, 1.5),
+        "trend": np.where(trend, 1.2, 1.0),
+    }
+    for j, key in enumerate(FEATURES):
+        matrix[:, j] = columns[key]
+    return matrix
+
+def total_scores(matrix: np.ndarray) -> List[float]:
+    """Weighted sum of each row, rounded to 3 places like the per-article scores."""
+    if not len(matrix):
+        return []
+    return [round(total, 3) for total in (matrix @ WEIGHTS).tolist()]
+
+def _api_feature_matrix(articles: list, remember_texts: bool = True) -> np.ndarray:
+    return feature_matrix(
+        [a.title for a in articles],
+        [a.content for a in articles],
+        [a.timestamp for a in articles],
+        [a.source for a in articles],
+        [a.views for a in articles],
+        [a.likes for a in articles],
+        [a.comments for a in articles],
+        HOT_TOPICS.union(fetch_trending_titles()),
+        remember_texts,
+    )
+
+def score(articles: Iterable, remember_texts: bool = True) -> List[float]:
+    """Scores API-style articles in input order, without ranking them."""
+    return total_scores(_api_feature_matrix(list(articles), remember_texts))
+
+def rank(articles: Iterable, debug: bool = False) -> List[dict]:
+    """
+    Ranks API-style articles (anything with title, content, timestamp, source,
+    views, likes and comments attributes), best first.
+    Returns [{"article", "score", "details"}], the /rank response shape.
+    """
+    articles = list(articles)
+    matrix = _api_feature_matrix(articles)
+    scores = total_scores(matrix)
+
+    # Stable, so ties keep request order as sorted() did
+    order = np.argsort(-np.array(scores), kind="stable")
+    return [
+        {
+            "article": articles[i],
+            "score": scores[i],
+            "details": dict(zip(FEATURES, matrix[i].tolist())) if debug else None,
+        }
+        for i in order.tolist()
+    ]
+
+def score_articles(articles: Iterable, like_counts: dict) -> List[float]:
+    """
+    Scores Django Article objects directly, in input order.
+    like_counts is {pk: number of users who liked it}, as api.serializers.get_like_counts returns.
+    """
+    articles = list(articles)
+    topics = HOT_TOPICS.union(fetch_trending_titles())
+
+    return total_scores(feature_matrix(
+        [a.title or "" for a in articles],
+        [a.longerSummary or a.summary or "" for a in articles],
+        [a.createdAt or DEFAULT_TIMESTAMP for a in articles],
+        [a.source or "default_source" for a in articles],
+        [a.popularityScore or 0 for a in articles],
+        [like_counts.get(a.pk, 0) for a in articles],
+        [0] * len(articles),
+        topics,
+    ))
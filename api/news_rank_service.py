@@ -1,62 +1,42 @@
-from fastapi import FastAPI, Query
-from pydantic import BaseModel, Field, validator
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, validator
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Union
-import requests
-import re
+from typing import Dict, List, Union
+import heapq
+import json
 import logging
-from functools import lru_cache
+
+from api import news_rank_engine
+from api.trending_topics import trending_topics
+
+STREAM_CHUNK_SIZE = 1000  # NDJSON articles scored per batch by /rank/stream
+
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refresh trending titles on the server's event loop, off the request path
+    refresher = trending_topics.start()
+    yield
+    if refresher:
+        refresher.cancel()
 
 # --- App Metadata ---
 app = FastAPI(
     title="News Ranking API",
     description="Ranks news articles based on multiple features like recency, source, engagement, etc.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- Logging ---
 logging.basicConfig(level=logging.INFO)
 
-# --- Constants ---
-TR_LOCATIONS = {
-    "istanbul", "ankara", "izmir", "bursa", "antalya", "adana", "konya",
-    "trabzon", "gaziantep", "diyarbakır", "kayseri", "mersin", "van",
-    "karabük", "kocaeli", "sakarya", "manisa", "edirne", "rize", "ordu",
-}
-
-HOT_TOPICS = {
-    "deprem", "ekonomi", "siyaset", "enflasyon", "zam",
-    "seçim", "aselsan", "savunma", "yapay zeka", "göçmen", "terör",
-    "iran", "israil", "ukrayna", "abd", "cumhurbaşkanı", "imamoğlu", "erdoğan", "ekrem imamoğlu", 
-    "özgür özel", "chp", "akp", "mhp", "dem", "gezi", "kılıçdaroğlu", 
-}
-
-SOURCE_WEIGHTS = {
-    "hurriyet": 1.0,
-    "cnn": 1.0,
-    "ntv": 1.0,
-    "sozcu": 1.3,
-    "haberler": 1.1,
-    "milliyet": 1.0,
-    "ensonhaber": 0.9,
-    "tele1": 1.3,
-    "t24": 1.0,
-    "bianet": 1.2,
-    "cumhuriyet": 1.3,
-    "ahaber": -0.5,
-}
-
-SCORE_WEIGHTS = {
-    "source": 0.18,
-    "recency": 0.20,
-    "engagement": 0.20,
-    "geo": 0.17,
-    "severity": 0.15,
-    "trend": 0.10,
-}
-
 # --- Models ---
 class NewsArticle(BaseModel):
+    id: Union[str, int, None] = None  # caller's article id, echoed back so scores can be joined by id
     title: str
     content: str
     timestamp: str
@@ -76,104 +56,146 @@ class NewsArticle(BaseModel):
 class NewsRankRequest(BaseModel):
     articles: List[NewsArticle]
     debug: bool = False
+    compact: bool = False  # respond with NewsScoresResponse instead of echoing every article
+
+    @validator("articles")
+    def validate_unique_ids(cls, articles):
+        # Scores are joined by str(id), so 5 and "5" would overwrite each other
+        seen = set()
+        for article in articles:
+            if article.id is None:
+                continue
+            if str(article.id) in seen:
+                raise ValueError(f"duplicate article id {article.id!r}")
+            seen.add(str(article.id))
+        return articles
 
 class NewsRankedResponse(BaseModel):
     article: NewsArticle
     score: float
     details: Union[dict, None] = None
 
-# --- Utility Functions ---
-def normalize(text: str) -> str:
-    return text.lower()
-
-def extract_words(text: str) -> set:
-    return set(re.findall(r"\w+", normalize(text)))
-
-def geo_score(text: str) -> float:
-    return 1.2 if TR_LOCATIONS.intersection(extract_words(text)) else 1.0
-
-def severity_predict(text: str) -> float:
-    score = 1.0
-    lowered = normalize(text)
-    if "ölü" in lowered or "ölüm" in lowered: score += 0.4
-    if "yaralı" in lowered: score += 0.2
-    if "patlama" in lowered: score += 0.3
-    return min(score, 1.5)
+class NewsScoresResponse(BaseModel):
+    scores: Dict[str, float]  # article id (request position when no id was sent) -> score
 
-from datetime import datetime, timezone
-
-def recency_weight(date_str: str) -> float:
-    try:
-        # Ensure that the article timestamp is timezone-naive
-        article_time = datetime.fromisoformat(date_str).astimezone(timezone.utc).replace(tzinfo=None)
-        # Get the current time as a naive datetime (also in UTC)
-        current_time = datetime.now(timezone.utc).replace(tzinfo=None)
-        
-        # Calculate time delta in seconds
-        delta = (current_time - article_time).total_seconds()
-        
-        if delta < 3600:  # Less than 1 hour
-            return 1.5
-        elif delta < 86400:  # Less than 24 hours
-            return 1.2
-        elif delta < 3 * 86400:  # Less than 3 days
-            return 1.0
-        else:
-            return 0.8
-    except Exception as e:
-        logging.error(f"Invalid timestamp: {e}")
-        return 1.0
-
-def engagement_score(views: int, likes: int, comments: int) -> float:
-    return min(1.5, 1.0 + 0.00005 * views + 0.01 * likes + 0.02 * comments)
-
-def source_weight(source: str) -> float:
-    return SOURCE_WEIGHTS.get(normalize(source), 1.0)
-
-def hot_topic_score(text: str, hot_topics: set) -> float:
-    return 1.2 if hot_topics.intersection(extract_words(text)) else 1.0
-
-@lru_cache(maxsize=1)
-def fetch_trending_titles() -> set:
-    try:
-        response = requests.get("https://trends.google.com/trends/trendingsearches/daily/rss?geo=TR")
-        titles = set(re.findall(r"<title>(.*?)</title>", response.text, re.DOTALL))
-        trending = {normalize(t) for t in titles if len(t.split()) < 8}
-        logging.info(f"Fetched {len(trending)} trending titles")
-        return trending
-    except Exception as e:
-        logging.warning(f"Failed to fetch trending titles: {e}")
-        return set()
-    
 # --- Routes ---
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the News Ranking API. Use the /rank endpoint to post news articles."}
 
-@app.post("/rank", response_model=List[NewsRankedResponse])
+@app.post("/rank", response_model=Union[List[NewsRankedResponse], NewsScoresResponse])
 def rank_articles(request: NewsRankRequest):
-    trending_titles = fetch_trending_titles()
-
-    results = []
-    for article in request.articles:
-        title = article.title
-        content = article.content
-
-        scores = {
-            "source": source_weight(article.source),
-            "recency": recency_weight(article.timestamp),
-            "engagement": engagement_score(article.views, article.likes, article.comments),
-            "geo": geo_score(f"{title} {content}"),
-            "severity": severity_predict(f"{title} {content}"),
-            "trend": hot_topic_score(f"{title} {content}", HOT_TOPICS.union(trending_titles)),
+    # Scoring lives in news_rank_engine, shared with the in-process Django path
+    if request.compact:
+        scores = news_rank_engine.score(request.articles)
+        by_id = {
+            str(article.id if article.id is not None else i): score
+            for i, (article, score) in enumerate(zip(request.articles, scores))
         }
-
-        total_score = sum(SCORE_WEIGHTS[key] * scores[key] for key in scores)
-
-        results.append(NewsRankedResponse(
-            article=article,
-            score=round(total_score, 3),
-            details=scores if request.debug else None
-        ))
-
-    return sorted(results, key=lambda x: x.score, reverse=True)
+        if len(by_id) < len(scores):
+            raise HTTPException(status_code=422, detail="article ids collide with the positions of articles sent without one")
+        return JSONResponse({"scores": by_id})
+
+    ranked = news_rank_engine.rank(request.articles, debug=request.debug)
+    for item in ranked:
+        item["article"] = item["article"].model_dump(exclude_none=True)
+    # The items already match NewsRankedResponse; returning a response directly skips
+    # FastAPI re-validating every one of them against response_model
+    return JSONResponse(ranked)
+
+
+# --- Streaming ---
+def _ndjson(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _parse_line(line: bytes, line_no: int):
+    """(id, NewsArticle) for one NDJSON line; raises ValueError on bad input."""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    try:
+        article = NewsArticle.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(e.errors(include_url=False)[0]["msg"])
+    return article.id if article.id is not None else line_no, article
+
+class _StreamRanker:
+    """Scores parsed NDJSON lines a chunk at a time, keeping only ids and scores (or the best top_k)."""
+
+    def __init__(self, top_k: Union[int, None]):
+        self.top_k = top_k
+        self.records = []  # NDJSON output lines, in input order
+        self.heap = []  # (score, -line_no, id): the best top_k so far, earliest line wins ties
+        self.chunk = []  # (id, line_no, article or None, error or None), in input order
+        self.seen_ids = set()  # str(id): clients join scores by it
+        self.line_no = 0
+
+    async def feed(self, lines):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                article_id, article = _parse_line(line, self.line_no)
+                if str(article_id) in self.seen_ids:
+                    raise ValueError(f"duplicate article id {article_id!r}")
+                self.seen_ids.add(str(article_id))
+            except ValueError as e:
+                self.chunk.append((None, self.line_no, None, str(e)))
+            else:
+                self.chunk.append((article_id, self.line_no, article, None))
+            self.line_no += 1
+
+            if len(self.chunk) >= STREAM_CHUNK_SIZE:
+                await self.score_chunk()
+
+    async def score_chunk(self):
+        if not self.chunk:
+            return
+        articles = [article for _, _, article, _ in self.chunk if article is not None]
+        # Streamed batches are one-off and large: don't fill the matcher's text memo with them
+        scores = iter(await run_in_threadpool(news_rank_engine.score, articles, remember_texts=False))
+        for article_id, seq, article, error in self.chunk:
+            if error is not None:
+                self.records.append(_ndjson({"line": seq, "error": error}))
+                continue
+            score = next(scores)
+            if self.top_k is None:
+                self.records.append(_ndjson({"id": article_id, "score": score}))
+            elif len(self.heap) < self.top_k:
+                heapq.heappush(self.heap, (score, -seq, article_id))
+            else:
+                heapq.heappushpop(self.heap, (score, -seq, article_id))
+        self.chunk = []
+
+    def results(self):
+        records = self.records + [
+            _ndjson({"id": article_id, "score": score})
+            for score, _, article_id in sorted(self.heap, reverse=True)
+        ]
+        # One write per chunk of lines rather than per line
+        for start in range(0, len(records), STREAM_CHUNK_SIZE):
+            yield b"".join(records[start:start + STREAM_CHUNK_SIZE])
+
+@app.post("/rank/stream")
+async def rank_articles_stream(request: Request, top_k: Union[int, None] = Query(None, ge=1)):
+    """
+    Ranks newline-delimited NewsArticle objects, each optionally carrying an "id"
+    (the 0-based line number is used otherwise). The body is scored chunk by chunk
+    as it arrives, so the batch is never held in memory as a whole.
+    Returns NDJSON {"id", "score"} lines in input order, or with top_k only the best
+    top_k, best first, kept in a bounded heap.
+    Lines that fail validation or repeat an earlier id come back as {"line", "error"}:
+    in input order among the scores, or ahead of the top_k.
+    """
+    ranker = _StreamRanker(top_k)
+    pending = b""
+    # Read here rather than inside the response generator: StreamingResponse also
+    # listens on receive() for disconnects and would swallow the body chunks
+    async for data in request.stream():
+        pending += data
+        *complete, pending = pending.split(b"\n")
+        await ranker.feed(complete)
+    await ranker.feed([pending])
+    await ranker.score_chunk()
+
+    return StreamingResponse(ranker.results(), media_type="application/x-ndjson")
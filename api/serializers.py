@@ -1,15 +1,84 @@
 from rest_framework import serializers
 from .models import Article, User
 
-from rest_framework import serializers
-from .models import Article, User
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Count
+
+# Bump when the article payload format changes so old cache entries are ignored
+ARTICLE_PAYLOAD_VERSION = 2
+# Entries are keyed by Article.updatedAt, so an edit is never served stale; this only
+# bounds how long superseded entries take up space
+ARTICLE_PAYLOAD_TIMEOUT = 24 * 60 * 60
+
+# Change without Article.save() (F() counter updates, likes) or depend on the viewer or
+# the request (absolute image URLs), so they are read fresh on every response instead of cached
+ARTICLE_LIVE_FIELDS = ('popularityScore', 'image', 'liked_by_count', 'is_liked')
+
+
+def article_payload_key(article):
+    return f"article_payload:{ARTICLE_PAYLOAD_VERSION}:{article.pk}:{int(article.updatedAt.timestamp() * 1_000_000)}"
+
+
+def get_article_payloads(articles, context=None):
+    """{pk: user-independent payload}, serializing and caching only the misses."""
+    keys = {article.pk: article_payload_key(article) for article in articles}
+    cached = cache.get_many(list(keys.values()))
+
+    payloads, missing = {}, {}
+    for article in articles:
+        payload = cached.get(keys[article.pk])
+        if payload is None:
+            payload = dict(ArticlePayloadSerializer(article, context=context).data)
+            missing[keys[article.pk]] = payload
+        payloads[article.pk] = payload
+
+    if missing:
+        cache.set_many(missing, timeout=ARTICLE_PAYLOAD_TIMEOUT)
+    return payloads
+
+
+def get_like_counts(articles):
+    """{pk: number of users who liked it} with one grouped query over the likes table."""
+    likes = User.likedArticles.through.objects.filter(article_id__in=[article.pk for article in articles])
+    return dict(likes.values('article_id').annotate(n=Count('pk')).order_by().values_list('article_id', 'n'))
+
+
+def get_viewer_liked_ids(request):
+    """Ids of the articles the requesting user liked, loaded once per request."""
+    if not (request and hasattr(request, "user") and request.user.is_authenticated):
+        return frozenset()
+    liked_ids = getattr(request, '_liked_article_ids', None)
+    if liked_ids is None:
+        liked_ids = set(request.user.likedArticles.values_list('pk', flat=True))
+        request._liked_article_ids = liked_ids
+    return liked_ids
+
+
+class ArticleListSerializer(serializers.ListSerializer):
+    """Serializes a page of articles with a constant number of queries."""
+
+    def to_representation(self, data):
+        articles = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        payloads = get_article_payloads(articles, self.context)
+        like_counts = get_like_counts(articles)
+        return [
+            self.child.compose(article, payloads[article.pk], like_counts.get(article.pk, 0))
+            for article in articles
+        ]
+
 
 class ArticleSerializer(serializers.ModelSerializer):
+    """
+    Article payload served from the shared payload cache (see get_article_payloads),
+    with ARTICLE_LIVE_FIELDS overlaid from the instance and the viewer.
+    """
     liked_by_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
+        list_serializer_class = ArticleListSerializer
         fields = [
             'id',
             'articleId',
@@ -28,16 +97,31 @@ class ArticleSerializer(serializers.ModelSerializer):
             'is_liked',
         ]
 
+    def to_representation(self, instance):
+        return self.compose(instance, get_article_payloads([instance], self.context)[instance.pk])
+
+    def compose(self, instance, payload, liked_by_count=None):
+        live = {
+            'popularityScore': instance.popularityScore,
+            'image': self.fields['image'].to_representation(instance.image) if instance.image else None,
+            'liked_by_count': self.get_liked_by_count(instance) if liked_by_count is None else liked_by_count,
+            'is_liked': self.get_is_liked(instance),
+        }
+        return {name: live[name] if name in live else payload[name] for name in self.Meta.fields}
 
     def get_liked_by_count(self, obj):
         return obj.liked_by_users.count()
 
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request, "user") and request.user.is_authenticated:
-            return obj in request.user.likedArticles.all()
-        return False
+        return obj.pk in get_viewer_liked_ids(self.context.get('request'))
+
+
+class ArticlePayloadSerializer(serializers.ModelSerializer):
+    """The cacheable, user-independent part of ArticleSerializer."""
 
+    class Meta:
+        model = Article
+        fields = [f for f in ArticleSerializer.Meta.fields if f not in ARTICLE_LIVE_FIELDS]
 
 
 class PrivacySettingsSerializer(serializers.Serializer):
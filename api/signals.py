@@ -0,0 +1,58 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from api.models import Article, ScoringCheckpoint, User, UserArticleScore
+from api.utils.feed_store import bump_feed_generation, mark_feeds_stale
+
+
+@receiver(post_init, sender=User)
+def remember_preferred_categories(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads (e.g. .only("id")) don't trigger a query
+    preferred = instance.__dict__.get("preferredCategories")
+    instance._original_preferred_categories = list(preferred) if isinstance(preferred, list) else preferred
+
+
+@receiver(post_save, sender=User)
+def mark_user_dirty_on_preference_change(sender, instance, created, update_fields=None, **kwargs):
+    # New users are picked up through ScoringCheckpoint.last_user_id
+    if created or (update_fields and "preferredCategories" not in update_fields):
+        return
+    current = instance.__dict__.get("preferredCategories")
+    if current != instance._original_preferred_categories:
+        ScoringCheckpoint.get().dirty_users.add(instance)
+        bump_feed_generation([instance.pk])
+        instance._original_preferred_categories = list(current) if isinstance(current, list) else current
+
+
+@receiver(post_save, sender=Article)
+def mark_article_dirty_on_edit(sender, instance, created, **kwargs):
+    # New articles are picked up through ScoringCheckpoint.last_article_id
+    if not created:
+        ScoringCheckpoint.get().dirty_articles.add(instance)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def mark_feeds_stale_on_article_change(sender, instance, **kwargs):
+    # Any feed may include the article, so every feed gets rebuilt
+    mark_feeds_stale()
+
+
+@receiver(post_save, sender=UserArticleScore)
+@receiver(post_delete, sender=UserArticleScore)
+def mark_feed_stale_on_score_change(sender, instance, **kwargs):
+    # bulk_upsert_scores sends no signals and marks the feeds itself
+    mark_feeds_stale([instance.user_id])
+
+
+@receiver(m2m_changed, sender=User.likedArticles.through)
+def invalidate_feed_on_like(sender, instance, action, reverse, pk_set, **kwargs):
+    # The liker's cached feed carries is_liked; other feeds' liked_by_count may lag
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        bump_feed_generation([instance.pk])
+    elif action == "pre_clear":
+        bump_feed_generation(instance.liked_by_users.values_list("pk", flat=True))
+    else:
+        bump_feed_generation(pk_set)
@@ -1,8 +1,171 @@
-from django.test import TestCase
+import contextlib
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import news_rank_engine
+from api.models import Article, ArticleInteraction, User, UserArticleScore
+from api.trending_topics import trending_topics
+from api.utils.interaction_features import InteractionFeatureTable
+from api.views import articleViews
 
 #  Test to check if the model is working correctly
 '''
 from api.models import User, UserArticleScore
-u = User.objects.get(email="u@u.com") 
+u = User.objects.get(email="u@u.com")
 UserArticleScore.objects.filter(user=u).values("priority", "score")[:5]
-'''
\ No newline at end of file
+'''
+
+CATEGORIES = ["Siyaset", "Spor", "Ekonomi", "Teknoloji", None]
+# A private cache per test run instead of the shared file cache the settings default to
+TEST_CACHES = {"default": {"BACKEND": "api.utils.cache_backends.InstrumentedLocMemCache"}}
+
+
+def seed(now, articles=30, users=4):
+    """Deterministic articles, users and interactions for the equivalence tests."""
+    arts = [
+        Article.objects.create(
+            articleId=f"a{i}", title=f"t{i} deprem istanbul", content="c",
+            category=CATEGORIES[i % len(CATEGORIES)],
+            priority=["most", "high", "low", None][i % 4] if i % 7 else "most",
+            popularityScore=(i * 37) % 150,
+            createdAt=now - timedelta(hours=(i * 13) % 200) if i % 5 else None,
+        )
+        for i in range(articles)
+    ]
+    people = [
+        User.objects.create_user(
+            email=f"u{i}@x.com", name=f"u{i}", userName=f"u{i}", password="x",
+            preferredCategories=CATEGORIES[i % 3:i % 3 + 2],
+        )
+        for i in range(users)
+    ]
+    for i in range(120):
+        ArticleInteraction.objects.create(
+            user=people[i % users], article=arts[(i * 7) % articles],
+            action=["view", "like", "click", "share"][i % 4], time_spent=[None, 3.0, 10.5][i % 3],
+        )
+    # Older than the incremental run's rescan margin, so they don't make everything dirty
+    ArticleInteraction.objects.update(timestamp=now - timedelta(days=1))
+    return arts, people
+
+
+def stored_scores():
+    return sorted(UserArticleScore.objects.values_list("user_id", "article_id", "score", "priority"))
+
+
+@override_settings(CACHES=TEST_CACHES)
+@mock.patch.object(trending_topics, "source", "stub")  # never reach trends.google.com
+@mock.patch("api.news_rank_engine.fetch_trending_titles", return_value=frozenset({"ekonomi haberi", "gezi"}))
+class ScoringEquivalenceTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.articles, self.users = seed(self.now)
+
+    def test_batch_scores_match_per_pair(self, _):
+        interactions = InteractionFeatureTable.load(self.users)
+        for user in self.users:
+            with mock.patch("django.utils.timezone.now", return_value=self.now):
+                per_pair = articleViews.score_articles_per_pair(user, self.articles, interactions)
+                batch = articleViews.score_articles_batch(user, self.articles, interactions, now=self.now)
+            self.assertEqual([(a.pk, s) for a, s in batch], [(a.pk, s) for a, s in per_pair])
+
+    def test_incremental_run_matches_full_run(self, _):
+        with mock.patch("django.utils.timezone.now") as clock, contextlib.redirect_stdout(io.StringIO()):
+            clock.return_value = self.now
+            Article.objects.create(articleId="aging", title="g", content="", category="Spor", priority="low",
+                                   popularityScore=40, createdAt=self.now - timedelta(hours=5))
+            # Latest interaction before the run; the next run re-scans only the margin behind it
+            ArticleInteraction.objects.create(user=self.users[0], article=self.articles[3], action="view")
+            articleViews.assign_priority()
+
+            # Two hours later: "aging" loses its 6 h boost and others pass a whole-day mark
+            clock.return_value = self.now + timedelta(hours=2)
+            Article.objects.create(articleId="new", title="n", content="", category="Spor", priority="high",
+                                   popularityScore=90, createdAt=clock.return_value - timedelta(hours=1))
+            ArticleInteraction.objects.create(user=self.users[0], article=self.articles[3], action="like", time_spent=4)
+            self.articles[20].popularityScore = 149
+            self.articles[20].save()
+            user = User.objects.get(pk=self.users[2].pk)
+            user.preferredCategories = ["Spor"]
+            user.save()
+            # Downgrades the stored "most" articles with update(), which sends no signals
+            with tempfile.TemporaryDirectory() as directory, mock.patch.object(articleViews, "GENERATED_ARTICLES_DIR", directory):
+                with open(os.path.join(directory, "breaking.json"), "w", encoding="utf-8") as f:
+                    json.dump({"articleId": "breaking", "title": "b", "category": "Siyaset", "priority": "most"}, f)
+                self.assertEqual(APIClient().post("/api/insert_articles/").status_code, 201)
+
+            articleViews.assign_priority(incremental=True)
+            incremental = stored_scores()
+            self.assertTrue(incremental)
+            articleViews.assign_priority()
+            self.assertEqual(incremental, stored_scores())
+
+    def test_feed_pages_match_full_feed(self, _):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        full = [a["id"] for a in client.get("/api/articles/for_you/").json()]
+        self.assertGreater(len(full), 7)
+
+        paged, cursor = [], None
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/api/articles/for_you/", params).json()
+            paged += [a["id"] for a in page["results"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(paged, full)
+
+
+@override_settings(CACHES=TEST_CACHES)
+@mock.patch.object(trending_topics, "source", "stub")
+class EngineEquivalenceTests(SimpleTestCase):
+    TOPICS = frozenset({"ekonomi haberi", "gezi"})
+
+    def articles(self):
+        now = timezone.now()
+        words = "istanbul ankara deprem ekonomi ölüm yaralı patlama yapay zeka haber seçim gezi ölümcül".split()
+        return [
+            mock.Mock(
+                title=" ".join(words[(i + k) % len(words)] for k in range(i % 5 + 1)),
+                content=" ".join(words[(i * k) % len(words)] for k in range(i % 9)),
+                timestamp=(now - timedelta(minutes=i * 97)).isoformat(),
+                source=list(news_rank_engine.SOURCE_WEIGHTS)[i % 12] if i % 13 else "other",
+                views=i * 131, likes=i % 50, comments=i % 7,
+            )
+            for i in range(300)
+        ]
+
+    def per_article_score(self, a):
+        text = f"{a.title} {a.content}"
+        topics = news_rank_engine.HOT_TOPICS.union(self.TOPICS)
+        features = {
+            "source": news_rank_engine.source_weight(a.source),
+            "recency": news_rank_engine.recency_weight(a.timestamp),
+            "engagement": news_rank_engine.engagement_score(a.views, a.likes, a.comments),
+            "geo": news_rank_engine.geo_score(text),
+            "severity": news_rank_engine.severity_predict(text),
+            "trend": news_rank_engine.hot_topic_score(text, topics),
+        }
+        return sum(features[key] * weight for key, weight in news_rank_engine.SCORE_WEIGHTS.items())
+
+    def test_vectorized_scores_match_per_article(self):
+        articles = self.articles()
+        with mock.patch("api.news_rank_engine.fetch_trending_titles", return_value=self.TOPICS):
+            scores = news_rank_engine.score(articles)
+            self.assertEqual(news_rank_engine.score(articles, remember_texts=False), scores)
+            ranked = news_rank_engine.rank(articles)
+
+        for article, score in zip(articles, scores):
+            # The matmul sums in a different order; only a rounding tie can move the 3rd decimal
+            self.assertAlmostEqual(score, self.per_article_score(article), delta=0.0011)
+        self.assertEqual([r["score"] for r in ranked], sorted(scores, reverse=True))
+        self.assertEqual(news_rank_engine.score([]), [])
@@ -0,0 +1,147 @@
+"""
+Trending topics for the ranking engine, refreshed in the background.
+
+get() never touches the network: it returns the last good snapshot, which is
+persisted to disk so a restarted process starts warm. Only server entry points
+call start() (news_rank_service.lifespan, backend/wsgi.py, the lifespan in
+backend/asgi.py); it runs a background asyncio task that refreshes the snapshot
+every TTL seconds, on the running event loop or else on a daemon thread. Every
+other process (workers forked after start(), management commands, tests) re-reads
+the snapshot the refreshing process keeps on disk.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+
+TRENDS_URL = "https://trends.google.com/trends/trendingsearches/daily/rss?geo=TR"
+
+# An http(s) URL serving the RSS feed, a local .json (list of titles) or text file
+# (one title per line), or "stub" for no trending titles at all
+TRENDS_SOURCE = os.getenv("TRENDS_SOURCE", TRENDS_URL)
+TRENDS_TTL = int(os.getenv("TRENDS_TTL", "900"))  # seconds between refreshes
+TRENDS_RETRY = 60  # seconds before retrying a failed refresh
+TRENDS_TIMEOUT = 5
+TRENDS_SNAPSHOT = os.getenv("TRENDS_SNAPSHOT", os.path.join(tempfile.gettempdir(), "veritas_trending_titles.json"))
+
+
+def parse_titles(titles) -> frozenset:
+    # Same filter as the original fetch: lowercased, fewer than 8 words
+    return frozenset(t.strip().lower() for t in titles if t.strip() and len(t.split()) < 8)
+
+
+class TrendingTopics:
+    def __init__(self, source=TRENDS_SOURCE, ttl=TRENDS_TTL, snapshot_path=TRENDS_SNAPSHOT):
+        self.source = source
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._titles = None
+        self._fetched_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresher_pid = None
+
+    def get(self) -> frozenset:
+        """
+        Current trending titles. Without a refresher in this process, the disk snapshot
+        is re-read once it is older than the TTL, at most every TRENDS_RETRY seconds.
+        """
+        if self.source == "stub":
+            return frozenset()
+        if self._titles is None or (
+            self._refresher_pid != os.getpid()
+            and time.time() - self._fetched_at >= self.ttl
+            and time.time() - self._checked_at >= TRENDS_RETRY
+        ):
+            self._load_snapshot()
+        return self._titles
+
+    def fetch(self) -> frozenset:
+        """Reads the source; raises on failure."""
+        if self.source == "stub":
+            return frozenset()
+        if self.source.startswith(("http://", "https://")):
+            response = requests.get(self.source, timeout=TRENDS_TIMEOUT)
+            response.raise_for_status()
+            return parse_titles(re.findall(r"<title>(.*?)</title>", response.text, re.DOTALL))
+        with open(self.source, encoding="utf-8") as f:
+            if self.source.endswith(".json"):
+                return parse_titles(json.load(f))
+            return parse_titles(f.read().splitlines())
+
+    def refresh(self) -> bool:
+        """Fetches once; keeps the last good snapshot if the source fails or comes back empty."""
+        try:
+            titles = self.fetch()
+        except Exception as e:
+            logging.warning(f"Failed to fetch trending titles: {e}")
+            return False
+        if not titles and self.source != "stub":
+            logging.warning("Trending source returned no titles, keeping the last snapshot")
+            return False
+
+        self._titles = titles
+        self._fetched_at = time.time()
+        logging.info(f"Fetched {len(titles)} trending titles")
+        self._save_snapshot()
+        return True
+
+    def _load_snapshot(self):
+        """Reads the disk snapshot if it is newer than what this process holds."""
+        with self._lock:
+            self._checked_at = time.time()
+            try:
+                with open(self.snapshot_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if self._titles is None or data["fetched_at"] > self._fetched_at:
+                    self._titles = frozenset(data["titles"])
+                    self._fetched_at = data["fetched_at"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            if self._titles is None:
+                self._titles = frozenset()
+
+    def _save_snapshot(self):
+        try:
+            # Write then rename, so a concurrent reader never sees half a file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.snapshot_path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self._fetched_at, "titles": sorted(self._titles)}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logging.warning(f"Could not persist trending titles: {e}")
+
+    async def run(self):
+        """Refresh loop; a snapshot younger than the TTL (e.g. from disk) is not refetched."""
+        if self._titles is None:
+            self._load_snapshot()
+        while True:
+            wait = self._fetched_at + self.ttl - time.time()
+            if wait <= 0:
+                ok = await asyncio.to_thread(self.refresh)
+                wait = self.ttl if ok else TRENDS_RETRY
+            await asyncio.sleep(wait)
+
+    def start(self):
+        """
+        Starts the refresher once per process: as a task when called on a running
+        event loop (returned so the caller can cancel it), else on a daemon thread.
+        """
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return None
+            self._refresher_pid = os.getpid()
+        try:
+            return asyncio.get_running_loop().create_task(self.run())
+        except RuntimeError:
+            threading.Thread(target=asyncio.run, args=(self.run(),), name="trending-refresher", daemon=True).start()
+            return None
+
+
+trending_topics = TrendingTopics()
@@ -10,7 +10,7 @@ from .views.userViews import (
     public_user_profile,
     UpdatePrivacySettingsView,
 )
-from .views.articleViews import InsertSingleArticleView, personalized_feed, log_article_interaction, ArticleListView, InsertArticlesView, delete_articles, get_articles, get_article_by_id
+from .views.articleViews import InsertSingleArticleView, personalized_feed, log_article_interaction, log_article_interactions_batch, ArticleListView, InsertArticlesView, delete_articles, get_articles, get_article_by_id
 from .views.authViews import RegisterView, LoginView, PasswordResetRequestView, PasswordResetConfirmView
 from .views.likeViews import like_article, unlike_article, get_liked_articles
 from .views.friendViews import UnfriendView, CombinedSearchView, FriendsWhoLikedArticleView, FriendsLikedArticlesView, FriendRequestListView, SendFriendRequestView, AcceptFriendRequestView, RejectFriendRequestView, ListFriendsView, SearchUsersView
@@ -44,6 +44,7 @@ urlpatterns = [
     path('articles/<int:pk>/', get_article_by_id, name='get_article_by_id'),
     # path("articles/for_you/", PersonalizedArticleListView.as_view()),
     path('log-interaction/', log_article_interaction),
+    path('log-interaction/batch/', log_article_interactions_batch),
     path("articles/for_you/", personalized_feed, name="personalized-feed"),
     path("insert_single_article/", InsertSingleArticleView.as_view(), name="insert_single_article"),
     
@@ -0,0 +1,180 @@
+"""
+Cache backends that count hits and misses per key namespace.
+
+Each is a stock Django backend plus MetricsMixin; settings.CACHES picks one from
+CACHE_URL. Counts are kept per process and folded into the cache itself every
+METRICS_FLUSH_INTERVAL seconds, so with a shared backend deployment_stats() covers
+every worker.
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.core.files import locks
+
+METRICS_FLUSH_INTERVAL = 60  # seconds
+FILE_CACHE_CULL_INTERVAL = 60  # seconds between directory scans of the file cache, per process
+METRICS_PREFIX = "cache_metrics"
+
+_MISSING = object()
+_state = threading.local()
+
+
+def key_namespace(key):
+    """"article_payload:1:12" -> "article_payload", "user_feed_12" -> "user_feed"."""
+    if ":" in key:
+        return key.split(":", 1)[0]
+    return re.sub(r"_[^_]*\d.*$", "", key)
+
+
+class MetricsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counts = defaultdict(Counter)  # since the last flush
+        self._totals = defaultdict(Counter)  # since this process started
+        self._counts_lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def _record(self, key, hit):
+        if key.startswith(METRICS_PREFIX):
+            return
+        namespace = key_namespace(key)
+        outcome = "hits" if hit else "misses"
+        with self._counts_lock:
+            self._counts[namespace][outcome] += 1
+            self._totals[namespace][outcome] += 1
+            due = time.monotonic() - self._flushed_at >= METRICS_FLUSH_INTERVAL
+        if due:
+            self.flush_metrics()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        # Backends without a native get_many call get() per key; get_many() counts those
+        if not getattr(_state, "in_get_many", False):
+            self._record(key, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        _state.in_get_many = True
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            _state.in_get_many = False
+        for key in keys:
+            self._record(key, key in found)
+        return found
+
+    def flush_metrics(self):
+        """Adds this process's counts since the last flush to the shared totals."""
+        with self._counts_lock:
+            counts, self._counts = self._counts, defaultdict(Counter)
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        try:
+            namespaces = super().get(f"{METRICS_PREFIX}:namespaces") or []
+            new = sorted(set(counts) - set(namespaces))
+            if new:
+                super().set(f"{METRICS_PREFIX}:namespaces", sorted(set(namespaces) | set(new)), timeout=None)
+            for namespace, outcomes in counts.items():
+                for outcome, n in outcomes.items():
+                    key = f"{METRICS_PREFIX}:{namespace}:{outcome}"
+                    self.add(key, 0, timeout=None)
+                    self.incr(key, n)
+        except Exception:
+            # Metrics must never break a request; these counts are simply lost
+            pass
+
+    def process_stats(self):
+        with self._counts_lock:
+            return _with_rates(self._totals)
+
+    def deployment_stats(self):
+        """Hits, misses and hit rate per namespace, summed over every process that flushed."""
+        self.flush_metrics()
+        namespaces = super().get(f"{METRICS_PREFIX}:namespaces") or []
+        keys = [f"{METRICS_PREFIX}:{ns}:{outcome}" for ns in namespaces for outcome in ("hits", "misses")]
+        found = super().get_many(keys)
+        totals = {
+            ns: {outcome: found.get(f"{METRICS_PREFIX}:{ns}:{outcome}", 0) for outcome in ("hits", "misses")}
+            for ns in namespaces
+        }
+        return _with_rates(totals)
+
+
+def _with_rates(totals):
+    stats = {}
+    for namespace, counts in sorted(totals.items()):
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        stats[namespace] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None}
+    return stats
+
+
+class SharedFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache made fit for several workers on one host:
+    - stock set() lists the whole directory to cull; here that happens at most every
+      FILE_CACHE_CULL_INTERVAL seconds, so the cache can run past MAX_ENTRIES meanwhile
+    - add(), incr() and decr() hold an exclusive lock on one lock file, so counters
+      (feed generations, metrics) don't lose updates between processes
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._lock_path = os.path.join(self._dir, "cache.lock")  # not a *.djcache file, never culled
+        self._culled_at = None
+        self._held = threading.local()
+
+    def _cull(self):
+        now = time.monotonic()
+        if self._culled_at is not None and now - self._culled_at < FILE_CACHE_CULL_INTERVAL:
+            return
+        self._culled_at = now
+        super()._cull()
+
+    @contextmanager
+    def _locked(self):
+        # Reentrant per thread: incr() can flush metrics, which calls add()
+        if getattr(self._held, "lock", False):
+            yield
+            return
+        self._createdir()
+        with open(self._lock_path, "ab") as f:
+            locks.lock(f, locks.LOCK_EX)
+            self._held.lock = True
+            try:
+                yield
+            finally:
+                self._held.lock = False
+                locks.unlock(f)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked():
+            return super().incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version)
+
+
+class InstrumentedRedisCache(MetricsMixin, RedisCache):
+    """Any Redis-protocol server (Redis, Valkey, KeyDB, ...); shared by every worker and host."""
+
+
+class InstrumentedFileBasedCache(MetricsMixin, SharedFileBasedCache):
+    """Shared by the workers of one host without a cache service; the default, kept in /dev/shm."""
+
+
+class InstrumentedLocMemCache(MetricsMixin, LocMemCache):
+    """Per process; for tests and single-process development."""
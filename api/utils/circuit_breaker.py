@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while a dependency is down.
+
+    closed: calls go through; failure_threshold consecutive failures open the circuit.
+    open: calls are refused until reset_timeout seconds have passed.
+    half_open: a single probe call is let through; success closes the circuit,
+    failure opens it for another reset_timeout.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now; in half_open only the one probe gets True."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit {self.name} closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit {self.name} opened after {self.failures} failure(s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
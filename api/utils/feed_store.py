@@ -0,0 +1,213 @@
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+from django.db import close_old_connections
+from django.db.models import F
+
+from api.models import Article, FeedGeneration, MaterializedFeed, UserArticleScore
+from api.utils.ranking_client import score_articles
+
+logger = logging.getLogger(__name__)
+
+FEED_SIZE = 200  # most recent articles considered for a feed
+# Seconds a hydrated feed response is kept. Entries are invalidated through the generation
+# counters below, which live in the database so every worker sees a bump; only the
+# counters (popularityScore, liked_by_count) can lag this long
+FEED_CACHE_TIMEOUT = int(os.getenv("FEED_CACHE_TIMEOUT", "3600"))
+
+_rebuilding = set()
+_rebuilding_lock = threading.Lock()
+
+
+def recent_articles(limit=FEED_SIZE):
+    # Limit initial query to recent articles in the database
+    return list(Article.objects.only(
+        "id", "articleId", "title", "summary", "longerSummary", "source", "popularityScore",
+        "createdAt", "category", "image"
+    ).order_by('-createdAt')[:limit])  # Use DB sorting instead of Python sorting
+
+
+def fetch_ranker_scores(articles):
+    """User-independent ranker scores, keyed by articleId."""
+    fastapi_scores = {}
+    try:
+        scores = score_articles(articles)  # keyed by pk, joined by id rather than position
+        for article in articles:
+            if article.pk in scores:
+                fastapi_scores[str(article.articleId)] = scores[article.pk]
+    except Exception as e:
+        print("⚠️ FastAPI ranker failed:", str(e))
+
+    return fastapi_scores
+
+
+def compute_feed_entries(user, articles, fastapi_scores):
+    """
+    The time-independent part of each article's hybrid score (ML + ranker), in article
+    order. Recency is added when the feed is served, see rank_feed_entries().
+    """
+    # Loaded once; both maps are built from the same rows
+    scored = list(UserArticleScore.objects.filter(user=user).values_list("article__articleId", "score", "priority"))
+    ml_scores = {article_id: score for article_id, score, _ in scored}
+    ml_priorities = {article_id: priority for article_id, _, priority in scored}
+
+    entries = []
+    for article in articles:
+        article_id = str(article.articleId)
+        if not article_id:
+            continue
+
+        title_lower = (article.title or "").strip().lower()
+        if title_lower in {"error", "failed to generate"}:
+            continue
+
+        ml_score = ml_scores.get(article_id, 0.5)
+        fastapi_score = fastapi_scores.get(article_id, 0.5)
+
+        created_at = article.createdAt or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        if not isinstance(created_at, datetime):
+            created_at = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+
+        entries.append({
+            "id": article.id,
+            "articleId": article_id,
+            "category": article.category,
+            "base": 0.3 * ml_score + 0.2 * fastapi_score,
+            "priority": ml_priorities.get(article_id, "low"),
+            "createdAt": article.createdAt.timestamp() if article.createdAt else None,
+            "publishedAt": created_at.timestamp(),
+        })
+    return entries
+
+
+def rank_feed_entries(entries, now=None):
+    """Stored entries with the current recency weight applied: scored, ranked best first, top one "most"."""
+    now = (now or datetime.now(timezone.utc)).timestamp()
+    ranked = []
+    most_entry = None
+    highest_score = -1
+
+    for stored in entries:
+        hours_since_pub = (now - stored["publishedAt"]) / 3600
+        recency_weight = np.exp(-hours_since_pub / 6)
+        hybrid_score = stored["base"] + (0.5 * recency_weight)
+
+        entry = {
+            "id": stored["id"],
+            "articleId": stored["articleId"],
+            "category": stored["category"],
+            "score": round(float(hybrid_score), 4),
+            "priority": stored["priority"],
+            "createdAt": stored["createdAt"],
+        }
+        ranked.append(entry)
+
+        if hybrid_score > highest_score:
+            most_entry = entry
+            highest_score = hybrid_score
+
+    if most_entry:
+        most_entry["priority"] = "most"
+
+    ranked.sort(
+        key=lambda e: (e["score"], e["createdAt"] if e["createdAt"] is not None else float("-inf")),
+        reverse=True
+    )
+    return ranked
+
+
+def rebuild_feed(user, articles=None, fastapi_scores=None):
+    if articles is None:
+        articles = recent_articles()
+    if fastapi_scores is None:
+        fastapi_scores = fetch_ranker_scores(articles)
+
+    feed, _ = MaterializedFeed.objects.update_or_create(
+        user=user,
+        defaults={"entries": compute_feed_entries(user, articles, fastapi_scores), "stale": False},
+    )
+    # Retire the hydrated response cached by personalized_feed
+    bump_feed_generation([user.pk])
+    return feed
+
+
+def rebuild_feeds(users):
+    """Rebuilds many feeds, sharing one article load and one ranker call between them."""
+    articles = recent_articles()
+    fastapi_scores = fetch_ranker_scores(articles)
+    count = 0
+    for user in users:
+        rebuild_feed(user, articles, fastapi_scores)
+        count += 1
+    return count
+
+
+def feed_cache_key(user_id):
+    """
+    Cache key of the user's hydrated feed. It carries the global and the user's
+    generation, so bumping either retires every entry cached before the change.
+    """
+    global_generation = FeedGeneration.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+    # A user without a feed yet gets one built (and its generation bumped) on this request
+    user_generation = MaterializedFeed.objects.filter(user_id=user_id).values_list("generation", flat=True).first()
+    return f"user_feed_{user_id}_{global_generation}_{'new' if user_generation is None else user_generation}"
+
+
+def bump_feed_generation(user_ids=None):
+    """Invalidates the cached feeds of the given users, or of everyone."""
+    if user_ids is None:
+        FeedGeneration.get()
+        FeedGeneration.objects.filter(pk=1).update(value=F("value") + 1)
+    else:
+        MaterializedFeed.objects.filter(user_id__in=user_ids).update(generation=F("generation") + 1)
+
+
+def mark_feeds_stale(user_ids=None):
+    """Flags the given users' feeds (or every feed) for a rebuild."""
+    # Without this a cached response would keep hiding the stale flag from get_feed_entries
+    bump_feed_generation(user_ids)
+    feeds = MaterializedFeed.objects.filter(stale=False)
+    if user_ids is not None:
+        feeds = feeds.filter(user_id__in=user_ids)
+    return feeds.update(stale=True)
+
+
+def _rebuild_in_background(user):
+    try:
+        close_old_connections()
+        rebuild_feed(user)
+    except Exception as e:
+        logger.warning(f"Background feed rebuild for user {user.pk} failed: {e}")
+    finally:
+        with _rebuilding_lock:
+            _rebuilding.discard(user.pk)
+        close_old_connections()
+
+
+def load_feed_entries(user):
+    """
+    The user's stored feed entries, unranked.
+    A missing feed (or one stored before recency moved to serve time) is built inline;
+    a stale one is served as is while a background thread rebuilds it (at most one
+    rebuild per user per process).
+    """
+    feed = MaterializedFeed.objects.filter(user=user).first()
+    if feed is None or any("base" not in entry for entry in feed.entries[:1]):
+        return rebuild_feed(user).entries
+
+    if feed.stale:
+        with _rebuilding_lock:
+            start = user.pk not in _rebuilding
+            _rebuilding.add(user.pk)
+        if start:
+            threading.Thread(target=_rebuild_in_background, args=(user,), daemon=True).start()
+
+    return feed.entries
+
+
+def get_feed_entries(user):
+    """The user's feed entries from the store, ranked as of now."""
+    return rank_feed_entries(load_feed_entries(user))
@@ -0,0 +1,125 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+
+from api.models import ArticleInteraction
+from api.utils.popularity import increment_counters
+from api.utils.retraining import request_retraining
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = 500  # flush as soon as this many events are buffered
+FLUSH_INTERVAL = 2.0  # seconds; otherwise flush at least this often
+MAX_BUFFERED = FLUSH_SIZE * 20  # events kept for retry when the DB is unavailable
+
+
+class InteractionBuffer:
+    """
+    Per-process buffer of article interactions written in batches.
+
+    A background thread flushes it with one bulk_create when FLUSH_SIZE events are
+    waiting or FLUSH_INTERVAL seconds have passed, then applies the popularity
+    counters once per article for the whole batch.
+    Events still buffered when a process is killed are lost; they are analytics,
+    not user data, and the window is a couple of seconds.
+    """
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL, max_buffered=MAX_BUFFERED):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._events = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, interactions):
+        """Buffers unsaved ArticleInteraction instances; never touches the DB."""
+        with self._lock:
+            self._events.extend(interactions)
+            pending = len(self._events)
+        self._ensure_flusher()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def _ensure_flusher(self):
+        # Threads don't survive a fork, so (re)start one per worker process
+        if self._pid != os.getpid() or not self._thread or not self._thread.is_alive():
+            with self._lock:
+                if self._pid != os.getpid() or not self._thread or not self._thread.is_alive():
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._run, name="interaction-flusher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+    def flush(self):
+        """Writes everything buffered so far; returns the number of events written."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+
+            try:
+                self._write(events)
+                written = len(events)
+            except (OperationalError, InterfaceError) as e:
+                # The DB is unreachable: keep them for the next flush, dropping the oldest beyond the cap
+                self._reset(events)
+                with self._lock:
+                    self._events = (events + self._events)[-self.max_buffered:]
+                logger.warning(f"Interaction flush of {len(events)} events failed, will retry: {e}")
+                return 0
+            except Exception as e:
+                # Some event can't be stored (e.g. its article was deleted): write the rest one by one
+                logger.warning(f"Interaction flush of {len(events)} events failed, writing them one by one: {e}")
+                written = self._write_each(events)
+
+        if written:
+            request_retraining()
+        return written
+
+    def _write(self, events):
+        with transaction.atomic():
+            ArticleInteraction.objects.bulk_create(events)
+
+            per_article = defaultdict(Counter)
+            for event in events:
+                per_article[event.article_id][event.action] += 1
+            for article_id, counts in per_article.items():
+                increment_counters(article_id, counts)
+
+    def _write_each(self, events):
+        self._reset(events)
+        written = 0
+        for event in events:
+            try:
+                self._write([event])
+                written += 1
+            except Exception as e:
+                # Retrying would only fail again and hold up every later event
+                logger.warning(f"Dropped interaction {event.action} on article {event.article_id}: {e}")
+        return written
+
+    @staticmethod
+    def _reset(events):
+        for event in events:
+            # bulk_create may have set ids before the rollback
+            event.pk = None
+            event._state.adding = True
+
+
+interaction_buffer = InteractionBuffer()
+atexit.register(interaction_buffer.flush)
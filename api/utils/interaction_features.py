@@ -0,0 +1,49 @@
+from django.db.models import Avg, Count, Q
+
+from api.models import ArticleInteraction
+
+
+class InteractionFeatureTable:
+    """
+    In-memory view/like/click/share counts and average time spent per (user, article).
+
+    Loaded with a single GROUP BY user_id, article_id query so that scoring runs
+    don't issue five ArticleInteraction queries for every pair.
+    Rows are stored sparsely: only pairs with at least one interaction are kept.
+    """
+
+    def __init__(self, rows=None):
+        # {user_id: {article_id: (views, likes, clicks, shares, avg_time)}}
+        self.rows = rows or {}
+
+    @classmethod
+    def load(cls, users=None, articles=None):
+        interactions = ArticleInteraction.objects.all()
+        if users is not None:
+            interactions = interactions.filter(user__in=users)
+        if articles is not None:
+            interactions = interactions.filter(article__in=articles)
+
+        aggregated = (
+            interactions
+            .values("user_id", "article_id")
+            .annotate(
+                views=Count("id", filter=Q(action="view")),
+                likes=Count("id", filter=Q(action="like")),
+                clicks=Count("id", filter=Q(action="click")),
+                shares=Count("id", filter=Q(action="share")),
+                avg_time=Avg("time_spent"),
+            )
+            .order_by()
+        )
+
+        rows = {}
+        for r in aggregated:
+            rows.setdefault(r["user_id"], {})[r["article_id"]] = (
+                r["views"], r["likes"], r["clicks"], r["shares"], r["avg_time"] or 0
+            )
+        return cls(rows)
+
+    def get(self, user, article):
+        """Returns (views, likes, clicks, shares, avg_time) for the pair, zeros if none."""
+        return self.rows.get(user.id, {}).get(article.id, (0, 0, 0, 0, 0))
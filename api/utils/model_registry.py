@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'views')
+MODEL_PATH = os.path.join(MODEL_DIR, 'recommender_model.pkl')
+FEATURE_PATH = os.path.join(MODEL_DIR, 'model_features.pkl')
+VERSION_PATH = os.path.join(MODEL_DIR, 'model_version.json')
+
+# Seconds between checks for a newer model on disk, 0 disables hot reload
+RELOAD_INTERVAL = float(os.getenv("RECOMMENDER_RELOAD_INTERVAL", "60"))
+KEEP_VERSIONS = 3
+
+
+def _versioned_path(path, version):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{version}{ext}"
+
+
+def _atomic_dump(obj, path):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    joblib.dump(obj, tmp_path)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_model_artifacts(model, feature_columns, model_path=MODEL_PATH, feature_path=FEATURE_PATH, version_path=VERSION_PATH):
+    """
+    Publishes a new model + feature list so running processes can pick it up safely.
+
+    Both artifacts are written under version-suffixed names (each via temp file + rename),
+    then model_version.json is atomically switched to point at them. Readers only ever
+    follow the pointer, so they never see a half-written pickle or a mismatched pair.
+    The unversioned paths are refreshed too for scripts that load them directly.
+    """
+    version = time.strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:8]
+    versioned_model = _versioned_path(model_path, version)
+    versioned_features = _versioned_path(feature_path, version)
+
+    _atomic_dump(model, versioned_model)
+    _atomic_dump(feature_columns, versioned_features)
+
+    tmp_version_path = f"{version_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_version_path, "w") as f:
+        json.dump({
+            "version": version,
+            "model": os.path.basename(versioned_model),
+            "features": os.path.basename(versioned_features),
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_version_path, version_path)
+
+    _atomic_dump(model, model_path)
+    _atomic_dump(feature_columns, feature_path)
+
+    _prune_old_versions(model_path, feature_path)
+    return version
+
+
+def _prune_old_versions(model_path, feature_path, keep=KEEP_VERSIONS):
+    for path in (model_path, feature_path):
+        directory = os.path.dirname(path)
+        root, ext = os.path.splitext(os.path.basename(path))
+        versions = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(root + ".") and name.endswith(ext) and name != os.path.basename(path)
+        )
+        for name in versions[:-keep]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+class ModelRegistry:
+    """
+    Loads the recommender model and its feature order on first use instead of at import time.
+
+    Each process holds its own copy: unpickling a scikit-learn forest copies every tree's
+    node arrays onto the heap. Calling load() before workers fork (gunicorn --preload) is
+    the only way to share one, copy-on-write.
+
+    At most every reload_interval seconds, get() checks model_version.json and, if a new
+    version was published, loads it on a background thread and swaps it in. Callers keep
+    using the pair they already hold until then.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, feature_path=FEATURE_PATH, version_path=VERSION_PATH,
+                 reload_interval=RELOAD_INTERVAL):
+        self.model_path = model_path
+        self.feature_path = feature_path
+        self.version_path = version_path
+        self.reload_interval = reload_interval
+        self.load_seconds = None
+        self.version = None
+        # (model, feature_columns) swapped as one tuple so readers never see a mixed pair
+        self._current = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._current is not None
+
+    def _read_stamp(self):
+        """(version, model file, features file, mtime) of what is currently published."""
+        try:
+            mtime = os.stat(self.version_path).st_mtime_ns
+            with open(self.version_path) as f:
+                pointer = json.load(f)
+            directory = os.path.dirname(self.version_path)
+            return (
+                pointer["version"],
+                os.path.join(directory, pointer["model"]),
+                os.path.join(directory, pointer["features"]),
+                mtime,
+            )
+        except (OSError, ValueError, KeyError):
+            # No pointer yet (artifacts from before versioning): fall back to the plain files
+            try:
+                mtime = os.stat(self.model_path).st_mtime_ns
+            except OSError:
+                mtime = None
+            return None, self.model_path, self.feature_path, mtime
+
+    def _load_stamp(self, stamp):
+        version, model_path, feature_path, _ = stamp
+        started = time.perf_counter()
+        model = joblib.load(model_path)
+        feature_columns = joblib.load(feature_path)
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Loaded recommender model {version or model_path} in {self.load_seconds:.3f}s (pid {os.getpid()})")
+        return model, feature_columns
+
+    def load(self):
+        with self._lock:
+            if self._current is not None:
+                return self._current
+
+            stamp = self._read_stamp()
+            self._current = self._load_stamp(stamp)
+            self._stamp, self.version = stamp, stamp[0]
+            self._checked_at = time.monotonic()
+            return self._current
+
+    def reload_if_changed(self):
+        """Loads and swaps in a newly published model; returns True if it did."""
+        if not self._reloading.acquire(blocking=False):
+            return False  # another thread is already reloading
+        try:
+            stamp = self._read_stamp()
+            if stamp == self._stamp:
+                return False
+            try:
+                current = self._load_stamp(stamp)
+            except Exception as e:
+                # e.g. a pre-versioning writer replacing the plain file mid-read; retry next check
+                logger.warning(f"Recommender model reload failed, keeping version {self.version}: {e}")
+                return False
+            self._current = current
+            self._stamp, self.version = stamp, stamp[0]
+            return True
+        finally:
+            self._reloading.release()
+
+    def get(self):
+        """Returns (model, feature_columns), loading them on first call."""
+        current = self._current
+        if current is None:
+            return self.load()
+
+        if self.reload_interval and time.monotonic() - self._checked_at >= self.reload_interval:
+            self._checked_at = time.monotonic()
+            threading.Thread(target=self.reload_if_changed, daemon=True).start()
+        return current
+
+
+recommender = ModelRegistry()
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connections
+
+DEFAULT_SHARDS_PER_WORKER = 4
+
+
+def _init_worker():
+    """Runs once in every pool process: own DB connection, one model copy."""
+    import django
+    django.setup()
+
+    from api.utils.model_registry import recommender
+
+    # Connections are opened lazily, so each worker gets its own on first query
+    connections.close_all()
+
+    # No-op if the model was loaded before the fork (pages shared copy-on-write);
+    # otherwise this worker loads its own copy
+    recommender.get()
+
+
+def _score_shard(user_ids, batch, write_batch_size):
+    from api.models import Article
+    from api.views.articleViews import User, score_users
+
+    articles = list(Article.objects.all())
+    has_breaking_news = any(article.priority == "most" for article in articles)
+    users = User.objects.filter(id__in=user_ids)
+    score_users(users, articles, has_breaking_news, batch=batch, write_batch_size=write_batch_size)
+    return len(user_ids)
+
+
+def assign_priority_parallel(workers=None, shards_per_worker=DEFAULT_SHARDS_PER_WORKER, batch=True, write_batch_size=None):
+    """
+    Full assign_priority() run with users split into shards across a process pool.
+    Each worker scores its shard and upserts the results into UserArticleScore itself.
+    """
+    from api.models import ScoringCheckpoint
+    from api.views.articleViews import (
+        SCORE_WRITE_BATCH_SIZE, User, current_scoring_marks, save_scoring_checkpoint,
+    )
+
+    workers = workers or os.cpu_count() or 1
+    write_batch_size = write_batch_size or SCORE_WRITE_BATCH_SIZE
+
+    checkpoint = ScoringCheckpoint.get()
+    marks = current_scoring_marks()
+    queued_user_ids = list(checkpoint.dirty_users.values_list("id", flat=True))
+    queued_article_ids = list(checkpoint.dirty_articles.values_list("id", flat=True))
+
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    shard_count = max(1, min(len(user_ids), workers * shards_per_worker))
+    shards = [user_ids[i::shard_count] for i in range(shard_count)]
+    print(f"👥 Users: {len(user_ids)} | 🧩 Shards: {len(shards)} | ⚙️ Workers: {workers}")
+
+    # Forked workers must not inherit the parent's open DB sockets
+    connections.close_all()
+
+    scored = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_score_shard, shard, batch, write_batch_size) for shard in shards if shard]
+        for future in as_completed(futures):
+            scored += future.result()
+
+    save_scoring_checkpoint(checkpoint, marks, queued_user_ids, queued_article_ids)
+    print(f"✅ Parallel re-scoring done → {scored} users")
+    return scored
@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from api.models import Article, ArticleInteraction
+
+# ArticleInteraction.action -> Article counter field
+ACTION_COUNTERS = {
+    'view': 'viewCount',
+    'like': 'likeCount',
+    'click': 'clickCount',
+    'share': 'shareCount',
+}
+
+
+def popularity_score(views, likes, clicks, shares):
+    """Weighted popularity score (adjust weights as needed)."""
+    # (3 * clicks) // 2 == int(1.5 * clicks), so the score stays integral
+    return views + (2 * likes) + (3 * clicks) // 2 + (3 * shares)
+
+
+def _popularity_expression(counters):
+    # Same formula on F() expressions; integer columns divide as integers in SQL
+    return (
+        counters['viewCount'] + (2 * counters['likeCount'])
+        + (3 * counters['clickCount']) / 2 + (3 * counters['shareCount'])
+    )
+
+
+def increment_counters(article_id, counts):
+    """
+    Adds {action: n} to the article's counters and re-derives popularityScore
+    in a single UPDATE, without reading the row or recounting interactions.
+    """
+    counters = {field: F(field) for field in ACTION_COUNTERS.values()}
+    for action, n in counts.items():
+        field = ACTION_COUNTERS.get(action)
+        if field and n:
+            counters[field] = counters[field] + n
+
+    changed = {field: value for field, value in counters.items() if not isinstance(value, F)}
+    if not changed:
+        return 0
+
+    return Article.objects.filter(pk=article_id).update(
+        popularityScore=_popularity_expression(counters),
+        **changed,
+    )
+
+
+def reconcile_popularity(batch_size=1000, apps=None, scores=True):
+    """
+    Recomputes exact counters and popularityScore for every article from ArticleInteraction.
+    With scores=False only the counters are backfilled. apps is a migration's app registry.
+    """
+    article_model = apps.get_model('api', 'Article') if apps else Article
+    interaction_model = apps.get_model('api', 'ArticleInteraction') if apps else ArticleInteraction
+
+    aggregated = (
+        interaction_model.objects
+        .values('article_id')
+        .annotate(**{
+            field: Count('id', filter=Q(action=action)) for action, field in ACTION_COUNTERS.items()
+        })
+        .order_by()
+    )
+    exact = {row.pop('article_id'): row for row in aggregated}
+
+    fields = list(ACTION_COUNTERS.values()) + (['popularityScore'] if scores else [])
+    changed = []
+    for article in article_model.objects.only('id', *fields).iterator():
+        counts = exact.get(article.id, {field: 0 for field in ACTION_COUNTERS.values()})
+        counts['popularityScore'] = popularity_score(
+            counts['viewCount'], counts['likeCount'], counts['clickCount'], counts['shareCount']
+        )
+        if any(getattr(article, field) != counts[field] for field in fields):
+            for field in fields:
+                setattr(article, field, counts[field])
+            changed.append(article)
+
+    with transaction.atomic():
+        article_model.objects.bulk_update(changed, fields, batch_size=batch_size)
+    return len(changed)
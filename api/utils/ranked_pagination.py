@@ -0,0 +1,88 @@
+import base64
+import heapq
+import json
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.response import Response
+
+from api.models import RankedSnapshot
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+SNAPSHOT_TIMEOUT = timedelta(minutes=30)  # how long a cursor stays valid after the first page
+
+
+class CursorError(Exception):
+    pass
+
+
+def wants_page(request):
+    """Pagination is opt-in, so clients expecting the full list keep working."""
+    return "limit" in request.GET or "cursor" in request.GET
+
+
+def _page_size(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise CursorError("limit must be an integer")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _encode_cursor(snapshot_id, offset):
+    raw = json.dumps({"s": snapshot_id.hex, "o": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return uuid.UUID(str(data["s"])), int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        raise CursorError("Invalid cursor")
+
+
+def top_k(entries, k):
+    """
+    The k best entries by score, best first, without sorting the rest.
+    Ties go to the earlier entry, so every page agrees on one total order.
+    """
+    return heapq.nsmallest(k, entries, key=lambda e: (-e["score"], e["_pos"]))
+
+
+def paginate_ranked(request, rank):
+    """
+    One page of a ranked list: returns (entries, next_cursor, count).
+
+    rank() returns the candidates as dicts with at least "id" and "score"; it only
+    runs for the first page. Those entries are then stored as a RankedSnapshot behind
+    the cursor, so later pages keep the same order while scores move, on any worker.
+    """
+    limit = _page_size(request)
+    scope = f"{request.path}:{request.user.pk}"
+    token = request.GET.get("cursor")
+    expired = timezone.now() - SNAPSHOT_TIMEOUT
+
+    if token:
+        snapshot_id, offset = _decode_cursor(token)
+        entries = RankedSnapshot.objects.filter(
+            pk=snapshot_id, scope=scope, created_at__gte=expired
+        ).values_list("entries", flat=True).first()
+        if entries is None:
+            raise CursorError("Cursor expired, request the first page again")
+    else:
+        offset = 0
+        entries = [dict(entry, _pos=pos) for pos, entry in enumerate(rank())]
+        snapshot_id = RankedSnapshot.objects.create(scope=scope, entries=entries).pk
+        RankedSnapshot.objects.filter(created_at__lt=expired).delete()
+
+    page = top_k(entries, offset + limit)[offset:]
+    next_offset = offset + limit
+    next_cursor = _encode_cursor(snapshot_id, next_offset) if next_offset < len(entries) else None
+    return page, next_cursor, len(entries)
+
+
+def paged_response(results, next_cursor, count):
+    return Response({"count": count, "next_cursor": next_cursor, "results": results})
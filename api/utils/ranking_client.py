@@ -0,0 +1,288 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from api import news_rank_engine
+from api.serializers import get_like_counts
+from api.utils.circuit_breaker import CircuitBreaker
+
+RANKING_API_URL = os.getenv("RANKING_API_URL", "http://144.91.84.230:8002/rank")
+RANKING_TIMEOUT = float(os.getenv("RANKING_TIMEOUT", "10"))
+# In-flight ranker calls allowed per process; also the keep-alive pool size
+RANKING_MAX_CONCURRENCY = int(os.getenv("RANKING_MAX_CONCURRENCY", "8"))
+# "inprocess" scores with news_rank_engine in this process, "http" posts to RANKING_API_URL,
+# "stub" gives every article a neutral score (tests, offline dev)
+RANKING_BACKEND = os.getenv("RANKING_BACKEND", "inprocess")
+# Consecutive failures that open the circuit, and seconds before a half-open probe
+RANKING_BREAKER_FAILURES = int(os.getenv("RANKING_BREAKER_FAILURES", "5"))
+RANKING_BREAKER_RESET = float(os.getenv("RANKING_BREAKER_RESET", "30"))
+LAST_KNOWN_TIMEOUT = 60 * 60 * 24  # seconds a ranker score is kept as the outage fallback
+# Seconds a cached score is reused; bounds how long a trending-topics change goes unseen
+SCORE_CACHE_TIMEOUT = int(os.getenv("RANKING_SCORE_CACHE_TIMEOUT", "900"))
+
+logger = logging.getLogger(__name__)
+
+
+class RankingError(Exception):
+    pass
+
+
+class RankerUnavailable(RankingError):
+    """Refused without calling out because the circuit is open."""
+
+
+def stub_transport(payload, params):
+    """Local stand-in for the ranking service: every article gets a neutral score."""
+    articles = payload.get("articles", [])
+    if payload.get("compact"):
+        return {"scores": {str(a.get("id", i)): 0.5 for i, a in enumerate(articles)}}
+    return [{"article": article, "score": 0.5, "details": None} for article in articles]
+
+
+class RankingClient:
+    """
+    Shared client for the FastAPI ranking service.
+
+    Sync calls reuse one keep-alive requests.Session; async calls (for async views
+    under backend/asgi.py) use one aiohttp session per event loop. Both are capped at
+    max_concurrency in-flight requests per process, so a slow ranker can't tie up every
+    worker thread, and the wait for a free slot counts against the call's timeout. All
+    calls go through one circuit breaker, so while the ranker is down they fail in
+    microseconds instead of waiting out the timeout.
+    A transport callable(payload, params) replaces the HTTP hop.
+    """
+
+    def __init__(self, url=RANKING_API_URL, timeout=RANKING_TIMEOUT, max_concurrency=RANKING_MAX_CONCURRENCY, transport=None):
+        self.url = url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.transport = transport
+        self.breaker = CircuitBreaker("ranker", RANKING_BREAKER_FAILURES, RANKING_BREAKER_RESET)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_sessions = {}
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def use_transport(self, transport):
+        """Routes rank() calls to transport instead of HTTP; None restores HTTP."""
+        self.transport = transport
+
+    def rank(self, payload, params=None, timeout=None):
+        """POSTs a NewsRankRequest payload and returns the decoded response."""
+        if self.transport is not None:
+            return self.transport(payload, params or {})
+
+        if not self.breaker.allow():
+            raise RankerUnavailable("Ranker circuit is open")
+
+        timeout = timeout or self.timeout
+        # One deadline for waiting on a slot and for the request itself
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            # Every slot held for a whole timeout: the ranker is too slow to keep up
+            self.breaker.record_failure()
+            raise RankingError("Too many concurrent ranking requests")
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout("Ranking timeout spent waiting for a free slot")
+            response = self.session.post(self.url, json=payload, params=params, timeout=remaining)
+            data = response.json() if response.status_code == 200 else None
+        except (requests.RequestException, ValueError) as e:
+            self.breaker.record_failure()
+            raise RankingError(str(e)) from e
+        finally:
+            self._slots.release()
+
+        return self._result(response.status_code, data, response.text if response.status_code != 200 else "")
+
+    async def arank(self, payload, params=None, timeout=None):
+        """asyncio variant of rank(); needs aiohttp."""
+        if self.transport is not None:
+            return self.transport(payload, params or {})
+
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        state = self._async_sessions.get(loop)
+        if state is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            state = (aiohttp.ClientSession(connector=connector), asyncio.Semaphore(self.max_concurrency))
+            self._async_sessions[loop] = state
+        session, slots = state
+
+        if not self.breaker.allow():
+            raise RankerUnavailable("Ranker circuit is open")
+
+        timeout = timeout or self.timeout
+        # One deadline for waiting on a slot and for the request itself
+        deadline = loop.time() + timeout
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise RankingError("Too many concurrent ranking requests") from None
+        try:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("Ranking timeout spent waiting for a free slot")
+            request_timeout = aiohttp.ClientTimeout(total=remaining)
+            async with session.post(self.url, json=payload, params=params, timeout=request_timeout) as response:
+                text = await response.text()
+                data = json.loads(text) if response.status == 200 else None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.breaker.record_failure()
+            raise RankingError(str(e) or type(e).__name__) from e
+        finally:
+            slots.release()
+
+        return self._result(response.status, data, text)
+
+    async def aclose(self):
+        """Closes the aiohttp session of the running loop, e.g. on ASGI shutdown."""
+        state = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if state:
+            await state[0].close()
+
+    def _result(self, status, data, text):
+        if status >= 500:
+            self.breaker.record_failure()
+        else:
+            # Any 2xx-4xx answer means the service itself is up
+            self.breaker.record_success()
+        if status != 200:
+            raise RankingError(f"Status {status}: {text[:500]}")
+        return data
+
+
+ranking_client = RankingClient(transport=stub_transport if RANKING_BACKEND == "stub" else None)
+
+
+def article_payload(article, likes=0):
+    """
+    NewsArticle JSON for the HTTP ranker, mirroring what news_rank_engine.score_articles reads.
+    likes is the article's liked_by count, from get_like_counts().
+    """
+    return {
+        "id": str(article.pk),
+        "title": article.title or "",
+        "content": article.longerSummary or article.summary or "",
+        "timestamp": article.createdAt.isoformat() if article.createdAt else "2025-01-01T00:00:00Z",
+        "source": article.source or "default_source",
+        "views": article.popularityScore or 0,
+        "likes": likes,
+        "comments": 0,
+    }
+
+
+def scores_by_id(data):
+    """id -> score from a compact {"scores": {...}} response, or from a ranked list echoing ids."""
+    if isinstance(data, dict) and isinstance(data.get("scores"), dict):
+        return data["scores"]
+    if isinstance(data, list):
+        scores = {}
+        for item in data:
+            article_id = (item.get("article") or {}).get("id")
+            if article_id is None:
+                # /rank sorts by score, so position says nothing about which article it was
+                raise RankingError("Ranker response carries no article ids")
+            scores[str(article_id)] = item.get("score", 0.5)
+        return scores
+    raise RankingError(f"Unexpected ranker response: {str(data)[:500]}")
+
+
+def _last_known_key(pk):
+    return f"ranker_last_{pk}"
+
+
+def last_known_scores(articles):
+    """The most recent ranker score of each article that has one."""
+    found = cache.get_many([_last_known_key(a.pk) for a in articles])
+    return {a.pk: found[_last_known_key(a.pk)] for a in articles if _last_known_key(a.pk) in found}
+
+
+def _recency_bucket(published, now):
+    """Which of news_rank_engine.recency_weight's brackets the article's age falls in."""
+    age = (now - (published or news_rank_engine.DEFAULT_TIMESTAMP)).total_seconds()
+    return sum(age >= limit for limit in (3600, 86400, 3 * 86400))
+
+
+def score_cache_key(article, now, likes=0):
+    """
+    (article, content hash, recency bucket, engagement bucket): everything the ranker's
+    score depends on apart from trending topics, coarse enough to survive new views.
+    """
+    payload = article_payload(article, likes)
+    content = hashlib.md5(f"{payload['title']}\0{payload['content']}\0{payload['source']}".encode()).hexdigest()[:16]
+    # Engagement moves the score by 0.2 * engagement; at 0.005 steps that is under 0.001
+    engagement = int(news_rank_engine.engagement_score(payload["views"], payload["likes"], payload["comments"]) * 200)
+    return f"ranker_score_{article.pk}_{content}_{_recency_bucket(article.createdAt, now)}_{engagement}"
+
+
+def _fetch_scores(articles, like_counts, genre, country, timeout):
+    payload = {
+        "articles": [article_payload(a, like_counts.get(a.pk, 0)) for a in articles],
+        "debug": False,
+        "compact": True,
+    }
+    try:
+        scores = scores_by_id(ranking_client.rank(payload, params={"genre": genre, "country": country}, timeout=timeout))
+    except RankingError as e:
+        logger.warning(f"Ranker unavailable ({e}), using last-known scores")
+        return last_known_scores(articles), False
+
+    scores = {a.pk: scores[str(a.pk)] for a in articles if str(a.pk) in scores}
+    cache.set_many({_last_known_key(pk): score for pk, score in scores.items()}, timeout=LAST_KNOWN_TIMEOUT)
+    return scores, True
+
+
+def score_articles(articles, genre="siyaset", country="TR", timeout=None):
+    """
+    Ranker scores as {article pk: score}; articles the ranker did not score are left out.
+    Runs the engine in-process unless RANKING_BACKEND or a test transport says otherwise.
+
+    Remote scores are user-independent, so they are cached per article under
+    score_cache_key() and only the misses are sent, in one batch. If the ranker fails
+    or its circuit is open, the misses get their last-known scores.
+    """
+    articles = list(articles)
+    if not articles:
+        return {}
+    like_counts = get_like_counts(articles)
+    if RANKING_BACKEND == "inprocess" and ranking_client.transport is None:
+        # Scoring in-process costs less than a cache round trip
+        return dict(zip((a.pk for a in articles), news_rank_engine.score_articles(articles, like_counts)))
+
+    now = datetime.now(timezone.utc)
+    keys = {a.pk: score_cache_key(a, now, like_counts.get(a.pk, 0)) for a in articles}
+    cached = cache.get_many(list(keys.values()))
+    scores = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+    misses = [a for a in articles if a.pk not in scores]
+    if misses:
+        fetched, fresh = _fetch_scores(misses, like_counts, genre, country, timeout)
+        scores.update(fetched)
+        if fresh:
+            cache.set_many({keys[pk]: score for pk, score in fetched.items()}, timeout=SCORE_CACHE_TIMEOUT)
+    return scores
@@ -0,0 +1,149 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import RetrainingJob
+
+logger = logging.getLogger(__name__)
+
+TRAINING_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'views', 'article_priorization.py')
+
+MIN_INTERVAL = timedelta(minutes=10)  # between the starts of two trainings
+STALE_AFTER = timedelta(hours=2)  # a running job older than this is assumed dead
+MAX_SLEEP = 60  # seconds; re-check the queue at least this often while waiting
+TRAINING_NICENESS = 10
+ERROR_TAIL_CHARS = 4000
+
+# At most one dispatcher thread per process; the DB constraints make it one training per deployment.
+# It is a daemon thread so a worker shutting down never waits for a scheduled job.
+_dispatch_lock = threading.Lock()
+_dispatch_pending = False
+
+
+def request_retraining():
+    """
+    Queues a retraining without blocking the caller.
+
+    Triggers arriving while a job is already queued are coalesced into it. A new job
+    is scheduled no earlier than MIN_INTERVAL after the previous training started.
+    """
+    if not RetrainingJob.objects.filter(status='queued').update(trigger_count=F('trigger_count') + 1):
+        last_started = (
+            RetrainingJob.objects.filter(started_at__isnull=False)
+            .order_by('-started_at')
+            .values_list('started_at', flat=True)
+            .first()
+        )
+        now = timezone.now()
+        not_before = max(now, last_started + MIN_INTERVAL) if last_started else now
+        try:
+            with transaction.atomic():
+                RetrainingJob.objects.create(not_before=not_before)
+        except IntegrityError:
+            # Another worker queued one between our UPDATE and INSERT
+            RetrainingJob.objects.filter(status='queued').update(trigger_count=F('trigger_count') + 1)
+
+    _schedule_dispatch()
+
+
+def _schedule_dispatch():
+    global _dispatch_pending
+    with _dispatch_lock:
+        if _dispatch_pending:
+            return
+        _dispatch_pending = True
+    threading.Thread(target=run_pending_jobs, name="retraining-dispatcher", daemon=True).start()
+
+
+def _fail_stale_jobs():
+    RetrainingJob.objects.filter(status='running', started_at__lt=timezone.now() - STALE_AFTER).update(
+        status='failed', finished_at=timezone.now(), error='Timed out or worker died'
+    )
+
+
+def _claim(job):
+    """Moves the job to running; False if it is gone or another training is running."""
+    _fail_stale_jobs()
+    try:
+        with transaction.atomic():
+            return bool(RetrainingJob.objects.filter(pk=job.pk, status='queued').update(
+                status='running', started_at=timezone.now(), worker_pid=os.getpid()
+            ))
+    except IntegrityError:
+        return False
+
+
+def _training_command():
+    # nice(1) rather than preexec_fn, which can deadlock the child of a threaded process
+    command = [sys.executable, TRAINING_SCRIPT]
+    nice = shutil.which('nice')
+    return [nice, '-n', str(TRAINING_NICENESS), *command] if nice else command
+
+
+def _run(job):
+    logger.info(f"Starting retraining job #{job.pk} ({job.trigger_count} triggers)")
+    return_code, error = None, None
+    try:
+        result = subprocess.run(
+            _training_command(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=STALE_AFTER.total_seconds(),
+        )
+        return_code = result.returncode
+        if return_code:
+            error = result.stderr.decode('utf-8', errors='replace')[-ERROR_TAIL_CHARS:]
+    except Exception as e:
+        error = str(e)
+
+    RetrainingJob.objects.filter(pk=job.pk).update(
+        status='succeeded' if return_code == 0 else 'failed',
+        finished_at=timezone.now(),
+        return_code=return_code,
+        error=error,
+    )
+    logger.info(f"Retraining job #{job.pk} finished with code {return_code}")
+
+
+def run_pending_jobs():
+    """Runs queued jobs one at a time until none are left for this process to run."""
+    global _dispatch_pending
+    close_old_connections()
+    try:
+        while True:
+            job = RetrainingJob.objects.filter(status='queued').first()
+            if job is None:
+                with _dispatch_lock:
+                    _dispatch_pending = False
+                # A trigger may have queued a job after our check but before the reset
+                if RetrainingJob.objects.filter(status='queued').exists():
+                    _schedule_dispatch()
+                return
+
+            wait = (job.not_before - timezone.now()).total_seconds()
+            if wait > 0:
+                time.sleep(min(wait, MAX_SLEEP))
+                continue
+
+            if not _claim(job):
+                # Another worker is training; it picks up the queued job when done
+                with _dispatch_lock:
+                    _dispatch_pending = False
+                return
+
+            _run(job)
+    except Exception as e:
+        logger.warning(f"Retraining dispatcher failed: {e}")
+        with _dispatch_lock:
+            _dispatch_pending = False
+    finally:
+        close_old_connections()
@@ -0,0 +1,29 @@
+from django.db import transaction
+
+from api.models import UserArticleScore
+from api.utils.feed_store import mark_feeds_stale
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def bulk_upsert_scores(scores, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes unsaved UserArticleScore instances in one transaction.
+
+    Each batch becomes a single INSERT ... ON CONFLICT (user_id, article_id) DO UPDATE,
+    instead of a SELECT plus INSERT/UPDATE per row as with update_or_create.
+    """
+    scores = list(scores)
+    if not scores:
+        return 0
+
+    with transaction.atomic():
+        UserArticleScore.objects.bulk_create(
+            scores,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["user", "article"],
+            update_fields=["score", "priority", "updated_at"],
+        )
+    mark_feeds_stale({score.user_id for score in scores})
+    return len(scores)
@@ -14,9 +14,22 @@ from api.serializers import ArticleSerializer
 logger = logging.getLogger(__name__)
 
 from api.utils.news_ranker import rank_articles
+from api.utils.ranked_pagination import CursorError, paged_response, paginate_ranked, wants_page
+
+
+def serialize_page(entries, context=None):
+    """Serializes just the page's articles, in page order, skipping any deleted since the snapshot."""
+    articles = Article.objects.in_bulk([e["id"] for e in entries])
+    entries = [e for e in entries if e["id"] in articles]
+    data = ArticleSerializer([articles[e["id"]] for e in entries], many=True, context=context or {}).data
+    return entries, data
+
 
 class ArticleListView(APIView):
     def get(self, request, *args, **kwargs):
+        if wants_page(request):
+            return self.get_page(request)
+
         articles = list(Article.objects.all())  # Get all
         rankings = rank_articles(articles, genre="politics", country="TR")
         score_map = {r["id"]: r["score"] for r in rankings}
@@ -27,6 +40,20 @@ class ArticleListView(APIView):
         serializer = ArticleSerializer(articles, many=True, context={'request': request})
         return Response(serializer.data)
 
+    def get_page(self, request):
+        def rank():
+            articles = list(Article.objects.all())
+            score_map = {r["id"]: r["score"] for r in rank_articles(articles, genre="politics", country="TR")}
+            return [{"id": a.pk, "score": score_map.get(str(a.articleId), 0)} for a in articles]
+
+        try:
+            entries, next_cursor, count = paginate_ranked(request, rank)
+        except CursorError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        _, data = serialize_page(entries, {'request': request})
+        return paged_response(data, next_cursor, count)
+
 
 # Directory path for JSON files
 GENERATED_ARTICLES_DIR = r"C:\Users\zeyne\Desktop\bitirme\VeritasNews\News-Objectify\objectified_jsons"
@@ -61,7 +88,10 @@ class InsertArticlesView(APIView):
                             priority = data.get("priority", None)
 
                             if priority == "most":
-                                Article.objects.filter(priority="most").update(priority="high")  # downgrade previous "most"
+                                previous_most = list(Article.objects.filter(priority="most").values_list("pk", flat=True))
+                                # Downgrade previous "most"; update() skips auto_now and the post_save signals
+                                Article.objects.filter(pk__in=previous_most).update(priority="high", updatedAt=timezone.now())
+                                ScoringCheckpoint.get().dirty_articles.add(*previous_most)
 
                             # ✅ Allow inserting even if title is missing
                             Article.objects.create(
@@ -148,14 +178,12 @@ def delete_articles(request, _id=-1):
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
-import requests
 from api.models import Article
 from api.serializers import ArticleSerializer
+from api.utils.ranking_client import score_articles
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-RANKING_API_URL = "http://144.91.84.230:8002/rank"
-
 @api_view(['GET'])
 def get_articles(request):
     category = request.GET.get('category', None)
@@ -164,57 +192,35 @@ def get_articles(request):
     if category:
         articles = articles.filter(category__iexact=category)
 
-    serializer = ArticleSerializer(articles, many=True)
-    serialized_data = serializer.data
-
-    # Prepare payload matching FastAPI expectations
-    ranking_payload = {
-        "articles": [
-            {
-                "title": a["title"] or "",
-                "content": a.get("longerSummary") or a["summary"] or "",
-                "timestamp": a["createdAt"] or "2025-01-01T00:00:00Z",
-                "source": a.get("source", "default_source"),
-                "views": a.get("popularityScore", 0),
-                "likes": a.get("liked_by_count", 0),
-                "comments": 0  # Optional field; add real data if you have it
-            }
-            for a in serialized_data
-        ],
-        "debug": False
-    }
-
-    try:
-        rank_response = requests.post(
-            RANKING_API_URL,
-            json=ranking_payload,
-            params={
-                "genre": category or "genel",
-                "country": "TR"
-            },
-            timeout=10
-        )
-
-        rank_data = rank_response.json()
-        print("⚡ Rank response data:", rank_data)
+    if wants_page(request):
+        def rank():
+            candidates = list(articles)
+            try:
+                scores = score_articles(candidates, genre=category or "genel", country="TR")
+            except Exception as e:
+                print("⚠️ Ranking API failed:", str(e))
+                scores = {}
+            return [{"id": a.pk, "score": scores.get(a.pk, 0)} for a in candidates]
 
-        score_map = {
-            str(serialized_data[idx]["articleId"]): r.get("score", 0.5)
-            for idx, r in enumerate(rank_data)
-            if idx < len(serialized_data)
-        }
+        try:
+            entries, next_cursor, count = paginate_ranked(request, rank)
+        except CursorError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        sorted_articles = sorted(
-            serialized_data,
-            key=lambda a: score_map.get(str(a["articleId"]), 0),
-            reverse=True
-        )
+        _, data = serialize_page(entries)
+        return paged_response(data, next_cursor, count)
 
-        return Response(sorted_articles)
+    articles = list(articles)
 
+    try:
+        scores = score_articles(articles, genre=category or "genel", country="TR")
+        # Order the model instances by an id join, then serialize once
+        articles.sort(key=lambda a: scores.get(a.pk, 0), reverse=True)
     except Exception as e:
         print("⚠️ Ranking API failed:", str(e))
-        return Response(serialized_data)
+
+    serializer = ArticleSerializer(articles, many=True)
+    return Response(serializer.data)
 
 
 @api_view(['GET'])
@@ -249,9 +255,13 @@ class PersonalizedArticleListView(APIView):
         serializer = ArticleSerializer(all_articles, many=True)
         return Response(serializer.data)
 
+import math
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from api.models import Article, ArticleInteraction
+from api.utils.interaction_buffer import interaction_buffer
+from api.utils.popularity import increment_counters
+from api.utils.retraining import request_retraining
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -267,44 +277,86 @@ def log_article_interaction(request):
             time_spent=data.get('time_spent')
         )
 
-        # ✅ Recalculate popularity score after new interaction
-        views = ArticleInteraction.objects.filter(article=article, action='view').count()
-        likes = ArticleInteraction.objects.filter(article=article, action='like').count()
-        clicks = ArticleInteraction.objects.filter(article=article, action='click').count()
-        shares = ArticleInteraction.objects.filter(article=article, action='share').count()
+        # ✅ Bump the article's counter and popularity score in one atomic UPDATE
+        increment_counters(article.pk, {interaction.action: 1})
 
-        # 🧠 Weighted popularity score formula (adjust weights as needed)
-        score = views + (2 * likes) + (1.5 * clicks) + (3 * shares)
-        article.popularityScore = int(score)
-        article.save()
+        # ✅ Queue model retraining (coalesced, one training at a time across workers)
+        request_retraining()
 
-        # ✅ Trigger model retraining script
-        from subprocess import Popen
-        import sys
-        import os
-        from django.core.cache import cache
-        from datetime import datetime, timedelta
+        return Response({'message': 'Logged, score updated, & retraining triggered ✅'}, status=201)
 
-        script_path = os.path.join(os.path.dirname(__file__), 'article_priorization.py')
+    except Exception as e:
+        return Response({'error': str(e)}, status=400)
 
-        last_run = cache.get("last_model_training", None)
-        now = datetime.now()
+def parse_article_pk(value):
+    """An article pk from an int or a numeric string; None for anything else (bools, lists, ...)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
 
-        if not last_run or (now - last_run) > timedelta(minutes=10):
-            cache.set("last_model_training", now, timeout=600)
-            Popen([sys.executable, script_path])
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def log_article_interactions_batch(request):
+    """
+    Accepts many interactions at once, either as a list or as {"events": [...]}:
+    [{"articleId": 1, "action": "view", "time_spent": 12.5}, ...]
+    Events are buffered and written in batches, so nothing is written during the request.
+    """
+    user = request.user
+    events = request.data.get('events') if isinstance(request.data, dict) else request.data
+    if not isinstance(events, list):
+        return Response({'error': 'Expected a list of events.'}, status=400)
+
+    valid_actions = {action for action, _ in ArticleInteraction.ACTION_CHOICES}
+    # Parsed before anything is hashed, so list or dict values are rejected instead of raising
+    article_ids = [parse_article_pk(e.get('articleId')) if isinstance(e, dict) else None for e in events]
+    existing_ids = set(Article.objects.filter(pk__in={i for i in article_ids if i is not None}).values_list('pk', flat=True))
+
+    interactions, errors = [], []
+    for idx, (event, article_id) in enumerate(zip(events, article_ids)):
+        if not isinstance(event, dict):
+            errors.append({'index': idx, 'error': 'Event must be an object.'})
+            continue
+        if article_id is None:
+            errors.append({'index': idx, 'error': f"Invalid articleId: {event.get('articleId')}"})
+            continue
+        if article_id not in existing_ids:
+            errors.append({'index': idx, 'error': 'Article not found.'})
+            continue
+        if not isinstance(event.get('action'), str) or event['action'] not in valid_actions:
+            errors.append({'index': idx, 'error': f"Invalid action: {event.get('action')}"})
+            continue
+        time_spent = event.get('time_spent')
+        if time_spent is not None:
+            try:
+                time_spent = float(time_spent)
+            except (TypeError, ValueError):
+                time_spent = None
+            # One unstorable value would otherwise fail the whole buffered batch
+            if time_spent is None or isinstance(event['time_spent'], bool) or not math.isfinite(time_spent):
+                errors.append({'index': idx, 'error': f"Invalid time_spent: {event['time_spent']}"})
+                continue
+        interactions.append(ArticleInteraction(
+            user=user,
+            article_id=article_id,
+            action=event['action'],
+            time_spent=time_spent
+        ))
 
-        return Response({'message': 'Logged, score updated, & retraining triggered ✅'}, status=201)
+    interaction_buffer.add(interactions)
 
-    except Exception as e:
-        return Response({'error': str(e)}, status=400)
+    return Response({'accepted': len(interactions), 'errors': errors}, status=202)
 
 
 # 🧠 FIXED: build_features — includes user preferences
 from django.db import models
 from django.utils import timezone
 
-def build_features(user, article):
+def build_features(user, article, interactions=None):
     categories = [
         "Siyaset", "Entertainment", "Spor", "Teknoloji", "Saglik", "Cevre", "Bilim", "Egitim",
         "Ekonomi", "Seyahat", "Moda", "Kultur", "Suc", "Yemek", "YasamTarzi", "IsDunyasi",
@@ -313,12 +365,19 @@ def build_features(user, article):
     ]
     priorities = ['high', 'medium', 'low']
 
-    interactions = ArticleInteraction.objects.filter(user=user, article=article)
-    views = interactions.filter(action='view').count()
-    likes = interactions.filter(action='like').count() * 2  # Give more weight to likes
-    clicks = interactions.filter(action='click').count() * 1.5  # Give more weight to clicks
-    shares = interactions.filter(action='share').count() * 3  # Give most weight to shares
-    time_spent = interactions.aggregate(avg_time=models.Avg("time_spent"))['avg_time'] or 0
+    if interactions is not None:
+        # Served from a preloaded InteractionFeatureTable, no queries per pair
+        views, likes, clicks, shares, time_spent = interactions.get(user, article)
+        likes *= 2  # Give more weight to likes
+        clicks *= 1.5  # Give more weight to clicks
+        shares *= 3  # Give most weight to shares
+    else:
+        interactions = ArticleInteraction.objects.filter(user=user, article=article)
+        views = interactions.filter(action='view').count()
+        likes = interactions.filter(action='like').count() * 2  # Give more weight to likes
+        clicks = interactions.filter(action='click').count() * 1.5  # Give more weight to clicks
+        shares = interactions.filter(action='share').count() * 3  # Give most weight to shares
+        time_spent = interactions.aggregate(avg_time=models.Avg("time_spent"))['avg_time'] or 0
 
     # Category and priority one-hot
     category_features = [1 if article.category == c else 0 for c in categories]
@@ -347,245 +406,381 @@ def build_features(user, article):
     return [float(f) if isinstance(f, (int, float)) and not pd.isna(f) else 0.0 for f in raw_features]
 
 from django.contrib.auth import get_user_model
-from api.models import Article, UserArticleScore
+from datetime import timedelta
+from django.db.models import Max, Q, Subquery
+from api.models import Article, ScoringCheckpoint, UserArticleScore
+from api.utils.interaction_features import InteractionFeatureTable
+from api.utils.parallel_priority import assign_priority_parallel
+from api.utils.score_writer import DEFAULT_BATCH_SIZE as SCORE_WRITE_BATCH_SIZE, bulk_upsert_scores
+from api.utils.model_registry import recommender
 import numpy as np
 import pandas as pd
-import joblib
-import os
 
 User = get_user_model()
 
-# Load model and features
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'recommender_model.pkl')
-FEATURE_PATH = os.path.join(os.path.dirname(__file__), 'model_features.pkl')
-model = joblib.load(MODEL_PATH)
-feature_columns = joblib.load(FEATURE_PATH)
+# Interactions are re-scanned this far behind the checkpoint; must exceed the longest
+# gap between an interaction's timestamp and its commit (buffer flushes take seconds)
+INTERACTION_RESCAN_MARGIN = timedelta(minutes=5)
+LABELLED_RANKS = 15  # label_user_scores() labels every rank from here on "low"
+# Article ages at which a score changes with time alone: the x1.3 boost ends at 6 h and
+# build_features()' days-old feature steps every whole day up to 7 (0 for future dates)
+RECENCY_BOUNDARIES = [timedelta(0), timedelta(hours=6)] + [timedelta(days=d) for d in range(1, 8)]
+
+def score_articles_per_pair(user, articles, interactions=None):
+    """Original scoring path: one predict_proba call per (user, article) pair."""
+    user_scores = []
+    user_preferred_categories = getattr(user, 'preferredCategories', []) or []
+    model, feature_columns = recommender.get()
+
+    for article in articles:
+        # Get model score
+        raw_features = build_features(user, article, interactions)
+        df = pd.DataFrame([raw_features])
+        df = df.reindex(columns=feature_columns, fill_value=0)
+
+        try:
+            model_score = float(model.predict_proba(df)[0][1])
+            if np.isnan(model_score):
+                raise ValueError("NaN score")
+        except Exception:
+            model_score = 0.5  # default fallback
+
+        # Apply additional boosting factors
+        final_score = model_score
+
+        # Boost for articles with "most" priority (breaking news)
+        if article.priority == "most":
+            final_score *= 2.5  # Higher boost for breaking news
+
+        # Boost for articles in user's preferred categories
+        if article.category in user_preferred_categories:
+            final_score *= 1.5  # 50% boost for preferred categories
+
+        # Recency boost (for newer articles)
+        if article.createdAt:
+            time_diff = timezone.now() - article.createdAt
+            if time_diff.days < 1:  # Less than a day old
+                hours_old = time_diff.seconds / 3600
+                if hours_old < 6:
+                    final_score *= 1.3  # 30% boost for very recent news
+
+        user_scores.append((article, final_score))
+
+    return user_scores
+
+def build_feature_matrix(user, articles, interactions=None):
+    """One row of build_features() per article, stacked into a single matrix."""
+    return np.array([build_features(user, article, interactions) for article in articles], dtype=float)
+
+def score_articles_batch(user, articles, interactions=None, now=None):
+    """
+    Vectorized equivalent of score_articles_per_pair():
+    - builds one feature matrix for all articles and calls predict_proba once
+    - applies the breaking news / preferred category / recency boosts as array ops
+    """
+    articles = list(articles)
+    if not articles:
+        return []
+
+    now = now or timezone.now()
+    user_preferred_categories = getattr(user, 'preferredCategories', []) or []
+
+    model, feature_columns = recommender.get()
+    df = pd.DataFrame(build_feature_matrix(user, articles, interactions))
+    df = df.reindex(columns=feature_columns, fill_value=0)
+
+    try:
+        model_scores = np.asarray(model.predict_proba(df)[:, 1], dtype=float)
+    except Exception:
+        model_scores = np.full(len(articles), 0.5)  # default fallback
+    model_scores = np.where(np.isnan(model_scores), 0.5, model_scores)
+
+    is_breaking = np.array([a.priority == "most" for a in articles])
+    is_preferred = np.array([a.category in user_preferred_categories for a in articles])
+
+    # Same rule as the per-pair path: timedelta.days < 1 and timedelta.seconds < 6h
+    deltas = [now - a.createdAt if a.createdAt else None for a in articles]
+    days_old = np.array([d.days if d is not None else 1 for d in deltas])
+    seconds_old = np.array([d.seconds if d is not None else 0 for d in deltas])
+    is_recent = (days_old < 1) & (seconds_old / 3600 < 6)
+
+    # Multiply in the same order as the per-pair path so floats match exactly
+    final_scores = model_scores.copy()
+    final_scores[is_breaking] *= 2.5
+    final_scores[is_preferred] *= 1.5
+    final_scores[is_recent] *= 1.3
+
+    return list(zip(articles, final_scores.tolist()))
+
+def label_user_scores(user_scores, has_breaking_news):
+    """Sorts (article, score) pairs and labels them most/high/medium/low by rank."""
+    # Sort by final score
+    user_scores = sorted(user_scores, key=lambda x: x[1], reverse=True)
+
+    labelled = []
+    # First pass: assign most to breaking news, otherwise to top article
+    for idx, (article, score) in enumerate(user_scores):
+        if article.priority == "most":
+            label = "most"  # Preserve existing breaking news priority
+        elif idx == 0 and not has_breaking_news:
+            label = "most"  # Top article becomes "most" if no breaking news exists
+        elif idx < 5:  # Top 5 articles
+            label = "high"
+        elif idx < 15:  # Next 10 articles
+            label = "medium"
+        else:
+            label = "low"
+        labelled.append((article, score, label))
+
+    return labelled
+
+def count_labels(labelled):
+    label_counts = {"most": 0, "high": 0, "medium": 0, "low": 0}
+    for _, _, label in labelled:
+        label_counts[label] += 1
+    return label_counts
+
+def current_scoring_marks():
+    """High-water marks captured before a run; anything newer is left for the next run."""
+    return {
+        "run_at": timezone.now(),
+        "last_interaction_at": ArticleInteraction.objects.aggregate(m=Max("timestamp"))["m"],
+        "last_article_id": Article.objects.aggregate(m=Max("id"))["m"] or 0,
+        "last_user_id": User.objects.aggregate(m=Max("id"))["m"] or 0,
+    }
+
+def save_scoring_checkpoint(checkpoint, marks, consumed_user_ids, consumed_article_ids):
+    checkpoint.last_interaction_at = marks["last_interaction_at"] or checkpoint.last_interaction_at
+    checkpoint.last_article_id = marks["last_article_id"]
+    checkpoint.last_user_id = marks["last_user_id"]
+    checkpoint.last_run_at = marks["run_at"]
+    checkpoint.save()
+    # Only drop what this run has seen; marks queued meanwhile stay for the next run
+    checkpoint.dirty_users.remove(*consumed_user_ids)
+    checkpoint.dirty_articles.remove(*consumed_article_ids)
+
+def score_users(users, articles, has_breaking_news, batch=True, write_batch_size=SCORE_WRITE_BATCH_SIZE):
+    """Scores, labels and stores every article for each of the given users."""
+    # One GROUP BY query for every (user, article) interaction count in this run
+    interactions = InteractionFeatureTable.load(users)
 
-def assign_priority(user=None):
+    score_articles = score_articles_batch if batch else score_articles_per_pair
+
+    for user in users:
+        labelled = label_user_scores(score_articles(user, articles, interactions), has_breaking_news)
+
+        # One transaction per user, batched INSERT ... ON CONFLICT DO UPDATE
+        bulk_upsert_scores(
+            [UserArticleScore(user=user, article=article, score=score, priority=label) for article, score, label in labelled],
+            batch_size=write_batch_size,
+        )
+
+        print(f"✅ Assigned {len(labelled)} articles for {user.email} → {count_labels(labelled)}")
+
+def assign_priority(user=None, batch=True, write_batch_size=SCORE_WRITE_BATCH_SIZE, incremental=False, workers=1):
+    if incremental and not user:
+        return assign_priority_incremental(batch=batch, write_batch_size=write_batch_size)
+    if workers != 1 and not user:
+        # Shard users across a process pool (workers=None uses every CPU core)
+        return assign_priority_parallel(workers=workers, batch=batch, write_batch_size=write_batch_size)
+
+    full_run = user is None
     if user:
         users = [user]
     else:
         users = User.objects.all()
+        checkpoint = ScoringCheckpoint.get()
+        marks = current_scoring_marks()
+        queued_user_ids = list(checkpoint.dirty_users.values_list("id", flat=True))
+        queued_article_ids = list(checkpoint.dirty_articles.values_list("id", flat=True))
 
-    articles = Article.objects.all()
-    print(f"👥 Users: {len(users)} | 📰 Articles: {articles.count()}")
+    articles = list(Article.objects.all())
+    print(f"👥 Users: {len(users)} | 📰 Articles: {len(articles)}")
 
     # First, identify any article with original "most" priority (breaking news)
-    breaking_news = list(articles.filter(priority="most"))
-    has_breaking_news = len(breaking_news) > 0
-    
-    for user in users:
-        user_scores = []
-        user_preferred_categories = getattr(user, 'preferredCategories', []) or []
+    has_breaking_news = any(article.priority == "most" for article in articles)
 
-        for article in articles:
-            # Get model score
-            raw_features = build_features(user, article)
-            df = pd.DataFrame([raw_features])
-            df = df.reindex(columns=feature_columns, fill_value=0)
+    score_users(users, articles, has_breaking_news, batch=batch, write_batch_size=write_batch_size)
 
-            try:
-                model_score = float(model.predict_proba(df)[0][1])
-                if np.isnan(model_score):
-                    raise ValueError("NaN score")
-            except Exception:
-                model_score = 0.5  # default fallback
-            
-            # Apply additional boosting factors
-            final_score = model_score
-            
-            # Boost for articles with "most" priority (breaking news)
-            if article.priority == "most":
-                final_score *= 2.5  # Higher boost for breaking news
-            
-            # Boost for articles in user's preferred categories
-            if article.category in user_preferred_categories:
-                final_score *= 1.5  # 50% boost for preferred categories
-            
-            # Recency boost (for newer articles)
-            if article.createdAt:
-                time_diff = timezone.now() - article.createdAt
-                if time_diff.days < 1:  # Less than a day old
-                    hours_old = time_diff.seconds / 3600
-                    if hours_old < 6:
-                        final_score *= 1.3  # 30% boost for very recent news
-            
-            user_scores.append((article, final_score))
-
-        # Sort by final score
-        user_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # Assign priority based on position and score
-        label_counts = {"most": 0, "high": 0, "medium": 0, "low": 0}
-        
-        # First pass: assign most to breaking news, otherwise to top article
-        for idx, (article, score) in enumerate(user_scores):
-            if article.priority == "most":
-                label = "most"  # Preserve existing breaking news priority
-            elif idx == 0 and not has_breaking_news:
-                label = "most"  # Top article becomes "most" if no breaking news exists
-            elif idx < 5:  # Top 5 articles
-                label = "high"
-            elif idx < 15:  # Next 10 articles
-                label = "medium"
-            else:
-                label = "low"
-                
-            label_counts[label] += 1
-            
-            UserArticleScore.objects.update_or_create(
-                user=user,
-                article=article,
-                defaults={"score": score, "priority": label}
+    if full_run:
+        save_scoring_checkpoint(checkpoint, marks, queued_user_ids, queued_article_ids)
+
+def assign_priority_incremental(batch=True, write_batch_size=SCORE_WRITE_BATCH_SIZE):
+    """
+    Re-scores only what changed since the last run:
+    - dirty users (new interactions, preference changes, new accounts) get a full re-score
+    - everyone else only scores dirty articles (new, edited or newly interacted with) and
+      reuses their stored UserArticleScore for the rest, then the top ranks are relabelled
+    Articles that crossed a RECENCY_BOUNDARIES age since the last run count as dirty too,
+    so stored scores match a full run. Only rows whose score or label changed are written.
+    Per clean user this reads the dirty articles' rows and the best LABELLED_RANKS +
+    len(dirty) others, not every row.
+    """
+    checkpoint = ScoringCheckpoint.get()
+    if checkpoint.last_run_at is None:
+        print("⚠️ No scoring checkpoint yet, running a full re-scoring")
+        return assign_priority(batch=batch, write_batch_size=write_batch_size)
+
+    marks = current_scoring_marks()
+    queued_user_ids = set(checkpoint.dirty_users.values_list("id", flat=True))
+    queued_article_ids = set(checkpoint.dirty_articles.values_list("id", flat=True))
+
+    changed_pairs = set()
+    if marks["last_interaction_at"]:
+        new_interactions = ArticleInteraction.objects.filter(timestamp__lte=marks["last_interaction_at"])
+        if checkpoint.last_interaction_at:
+            # timestamp is set before commit, so a row can land after the previous run with an
+            # older timestamp; re-scan an overlap (pairs already seen just get re-scored)
+            new_interactions = new_interactions.filter(
+                timestamp__gt=checkpoint.last_interaction_at - INTERACTION_RESCAN_MARGIN
             )
+        changed_pairs = set(new_interactions.values_list("user_id", "article_id").distinct())
+
+    new_user_ids = User.objects.filter(
+        id__gt=checkpoint.last_user_id, id__lte=marks["last_user_id"]
+    ).values_list("id", flat=True)
+    new_article_ids = Article.objects.filter(
+        id__gt=checkpoint.last_article_id, id__lte=marks["last_article_id"]
+    ).values_list("id", flat=True)
+    aged = Q()
+    for age in RECENCY_BOUNDARIES:
+        aged |= Q(createdAt__gt=checkpoint.last_run_at - age, createdAt__lte=marks["run_at"] - age)
+    aged_article_ids = Article.objects.filter(aged).values_list("id", flat=True)
+
+    dirty_user_ids = queued_user_ids | {u for u, _ in changed_pairs} | set(new_user_ids)
+    # Any interaction changes the article's popularityScore, a feature for every user
+    dirty_article_ids = (
+        queued_article_ids | {a for _, a in changed_pairs} | set(new_article_ids) | set(aged_article_ids)
+    )
 
-        print(f"✅ Assigned {len(user_scores)} articles for {user.email} → {label_counts}")
-                
-def extract_user_features(user):
-    # You can later use things like time of day, recent activity, etc.
-    return {}
+    print(f"🧹 Dirty users: {len(dirty_user_ids)} | 🧹 Dirty articles: {len(dirty_article_ids)}")
 
-import os
-import joblib
+    if dirty_user_ids or dirty_article_ids:
+        articles = list(Article.objects.all())
+        has_breaking_news = any(article.priority == "most" for article in articles)
+        score_articles = score_articles_batch if batch else score_articles_per_pair
+
+        score_users(
+            User.objects.filter(id__in=dirty_user_ids), articles, has_breaking_news,
+            batch=batch, write_batch_size=write_batch_size,
+        )
 
-# Load model from the same directory as this file
-# Load model and expected feature order
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'recommender_model.pkl')
-FEATURE_PATH = os.path.join(os.path.dirname(__file__), 'model_features.pkl')
+        if dirty_article_ids:
+            dirty_articles = [a for a in articles if a.id in dirty_article_ids]
+            article_interactions = InteractionFeatureTable.load(articles=dirty_articles)
+
+            # Every rank past LABELLED_RANKS is "low", so only the dirty articles and the stored
+            # rows that can still make the top ranks (ties included) take part in relabelling
+            window = LABELLED_RANKS + len(dirty_articles)
+            clean_count = len(articles) - len(dirty_articles)
+            incomplete_user_ids = []
+
+            for user in User.objects.exclude(id__in=dirty_user_ids):
+                user_rows = UserArticleScore.objects.filter(user=user)
+                if len(articles) > window:
+                    nth_score = user_rows.order_by("-score").values("score")[window - 1:window]
+                    user_rows = user_rows.filter(Q(article_id__in=dirty_article_ids) | Q(score__gte=Subquery(nth_score)))
+                stored = {
+                    article_id: (score, priority)
+                    for article_id, score, priority in user_rows.values_list("article_id", "score", "priority")
+                }
+
+                if sum(article_id not in dirty_article_ids for article_id in stored) < min(LABELLED_RANKS, clean_count):
+                    # Fewer stored rows than a scored user always has: re-score in full below
+                    incomplete_user_ids.append(user.id)
+                    continue
+
+                score_map = {article.id: score for article, score in score_articles(user, dirty_articles, article_interactions)}
+                # Kept in `articles` order so ties break exactly as in a full run; new
+                # articles have no stored row yet and come from score_map
+                user_scores = [
+                    (article, score_map[article.id] if article.id in score_map else stored[article.id][0])
+                    for article in articles
+                    if article.id in score_map or article.id in stored
+                ]
+                labelled = label_user_scores(user_scores, has_breaking_news)
+
+                bulk_upsert_scores(
+                    [
+                        UserArticleScore(user=user, article=article, score=score, priority=label)
+                        for article, score, label in labelled
+                        if stored.get(article.id) != (score, label)
+                    ],
+                    batch_size=write_batch_size,
+                )
+
+            if incomplete_user_ids:
+                score_users(
+                    User.objects.filter(id__in=incomplete_user_ids), articles, has_breaking_news,
+                    batch=batch, write_batch_size=write_batch_size,
+                )
+
+    save_scoring_checkpoint(checkpoint, marks, queued_user_ids, queued_article_ids)
+    print(f"✅ Incremental re-scoring done → {len(dirty_user_ids)} users, {len(dirty_article_ids)} articles")
 
-model = joblib.load(MODEL_PATH)
-feature_columns = joblib.load(FEATURE_PATH)  # list of expected feature names
+def extract_user_features(user):
+    # You can later use things like time of day, recent activity, etc.
+    return {}
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from api.models import Article, UserArticleScore
 from api.serializers import ArticleSerializer
-import requests
-from datetime import datetime, timedelta
-
-FASTAPI_RANKING_URL = "http://144.91.84.230:8002/rank"  # POST request should be sent to this URL
-
 from django.core.cache import cache
-from more_itertools import chunked
+from api.utils.feed_store import FEED_CACHE_TIMEOUT, feed_cache_key, get_feed_entries, load_feed_entries, rank_feed_entries
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def personalized_feed(request):
-    from datetime import datetime, timezone
-    import numpy as np
-
     user = request.user
-    cache_key = f"user_feed_{user.id}"
-    cached = cache.get(cache_key)
-    if cached:
-        return Response(cached)
-
-    # Limit initial query to recent articles in the database
-    recent_articles = Article.objects.only(
-        "id", "articleId", "title", "summary", "popularityScore", 
-        "createdAt", "category", "image"
-    ).order_by('-createdAt')[:200]  # Use DB sorting instead of Python sorting
-    
-    scored_qs = UserArticleScore.objects.filter(user=user).select_related('article')
-    ml_scores = {s.article.articleId: s.score for s in scored_qs}
-    ml_priorities = {s.article.articleId: s.priority for s in scored_qs}
-
-    # Format data for FastAPI ranking
-    fastapi_request = {
-        "articles": [
-            {
-                "title": a.title or "",
-                "content": a.summary or "",
-                "timestamp": a.createdAt.isoformat() if a.createdAt else "2025-01-01T00:00:00Z",
-                "source": getattr(a, "source", "default_source"),
-                "views": a.popularityScore or 0,
-                "likes": 0,  # Add real data if available
-                "comments": 0  # Add real data if available
-            }
-            for a in recent_articles
-        ],
-        "debug": False
-    }
-
-    fastapi_scores = {}
-    try:
-        # You might need to break this into smaller batches if you have too many articles
-        response = requests.post(
-            "http://144.91.84.230:8002/rank",
-            json=fastapi_request,
-            params={"genre": "siyaset", "country": "TR"},
-            timeout=10
-        )
-        
-        if response.ok:
-            response_data = response.json()
-            if isinstance(response_data, list):
-                for idx, r in enumerate(response_data):
-                    if idx < len(recent_articles):
-                        article_id = str(recent_articles[idx].articleId)
-                        fastapi_scores[article_id] = r.get("score", 0.5)
-            else:
-                print("Expected list, but got:", response_data)
-    except Exception as e:
-        print("⚠️ FastAPI ranker failed:", str(e))
-
-    combined = []
-    most_article_id = None
-    highest_score = -1
-
-    for article in recent_articles:
-        article_id = str(article.articleId)
-        if not article_id:
-            continue
-
-        title_lower = (article.title or "").strip().lower()
-        if title_lower in {"error", "failed to generate"}:
-            continue
+    category = request.GET.get("category")
+    priority = request.GET.get("priority")
 
-        ml_score = ml_scores.get(article_id, 0.5)
-        fastapi_score = fastapi_scores.get(article_id, 0.5)
+    if wants_page(request):
+        def rank():
+            # Feed entries are already ranked; filter before paging so pages stay full
+            return [
+                e for e in get_feed_entries(user)
+                if (not category or e["category"] == category) and (not priority or e["priority"] == priority)
+            ]
 
-        created_at = article.createdAt or datetime(2025, 1, 1, tzinfo=timezone.utc)
-        if not isinstance(created_at, datetime):
-            created_at = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        try:
+            entries, next_cursor, count = paginate_ranked(request, rank)
+        except CursorError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        hours_since_pub = (datetime.now(timezone.utc) - created_at).total_seconds() / 3600
-        recency_weight = np.exp(-hours_since_pub / 6)
+        entries, data = serialize_page(entries, {'request': request})
+        for entry, art_data in zip(entries, data):
+            art_data['relevance_score'] = entry["score"]
+            art_data['personalized_priority'] = entry["priority"]
+        return paged_response(data, next_cursor, count)
 
-        hybrid_score = ((0.3 * ml_score + 0.2 * fastapi_score) + (0.5 * recency_weight))
+    cache_key = feed_cache_key(user.id)
+    cached = cache.get(cache_key)
 
-        if hybrid_score > highest_score:
-            most_article_id = article_id
-            highest_score = hybrid_score
+    if cached is None:
+        # Feed entries come precomputed from the feed store, only hydration happens here
+        entries = load_feed_entries(user)
+        articles = Article.objects.in_bulk([e["id"] for e in entries])
+        entries = [e for e in entries if e["id"] in articles]  # skip articles deleted since the build
 
-        priority = ml_priorities.get(article_id, "low")
+        serialized = ArticleSerializer([articles[e["id"]] for e in entries], many=True, context={'request': request}).data
+        cached = (entries, {entry["id"]: art_data for entry, art_data in zip(entries, serialized)})
+        cache.set(cache_key, cached, timeout=FEED_CACHE_TIMEOUT)
 
-        art_data = ArticleSerializer(article, context={'request': request}).data
-        art_data['relevance_score'] = round(hybrid_score, 4)
-        art_data['personalized_priority'] = priority
+    # Ranked on every request, so recency keeps moving while the cached entry lives
+    entries, payloads = cached
+    combined = []
+    for entry in rank_feed_entries(entries):
+        art_data = dict(payloads[entry["id"]])
+        art_data['relevance_score'] = entry["score"]
+        art_data['personalized_priority'] = entry["priority"]
         combined.append(art_data)
 
-    if most_article_id:
-        for a in combined:
-            if str(a["articleId"]) == most_article_id:
-                a["personalized_priority"] = "most"
-
-    category = request.GET.get("category")
-    priority = request.GET.get("priority")
-
     if category:
         combined = [a for a in combined if a.get("category") == category]
     if priority:
         combined = [a for a in combined if a.get("personalized_priority") == priority]
 
-    combined.sort(
-        key=lambda x: (
-            round(float(x["relevance_score"]), 4),
-            datetime.fromisoformat(x["createdAt"].replace("Z", "+00:00")) if x.get("createdAt") else datetime.min
-        ),
-        reverse=True
-    )
-
-    cache.set(cache_key, combined, timeout=300)
-    return Response(combined)
\ No newline at end of file
+    return Response(combined)
@@ -151,14 +151,12 @@ plt.barh(features, importances)
 # --------------------------------------------
 # 9. Save
 # --------------------------------------------
-MODEL_DIR = os.path.dirname(__file__)
-MODEL_PATH = os.path.join(MODEL_DIR, 'recommender_model.pkl')
-FEATURE_PATH = os.path.join(MODEL_DIR, 'model_features.pkl')
+from api.utils.model_registry import MODEL_PATH, FEATURE_PATH, save_model_artifacts
 
-joblib.dump(model, MODEL_PATH)
-joblib.dump(X.columns.tolist(), FEATURE_PATH)
+# Versioned files + atomic rename, running Django processes hot-reload it
+version = save_model_artifacts(model, X.columns.tolist())
 
-print(f"✅ Model saved to {MODEL_PATH}")
+print(f"✅ Model saved to {MODEL_PATH} (version {version})")
 print(f"📜 Feature order saved to {FEATURE_PATH}")
 
 
@@ -13,4 +13,28 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # Django doesn't handle the lifespan protocol; answer it here to refresh trending
+    # titles on the server's event loop and to close the shared ranking client's
+    # aiohttp session when the server shuts down
+    if scope["type"] == "lifespan":
+        from api.trending_topics import trending_topics
+        from api.utils.ranking_client import ranking_client
+
+        refresher = None
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                refresher = trending_topics.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if refresher:
+                    refresher.cancel()
+                await ranking_client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    await django_application(scope, receive, send)
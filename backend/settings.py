@@ -137,6 +137,42 @@ DATABASES = {
     'default': dj_database_url.config(default=os.getenv("DATABASE_URL"))
 }
 
+# Shared cache, so every gunicorn worker sees the same feeds, cursors, throttles and
+# metrics (api/utils/cache_backends.py). CACHE_URL picks the backend:
+#   redis://host:6379/0 (or rediss://, unix://)  any Redis-protocol server, shared across hosts
+#   file:///path                                 files shared by the workers of one host
+#   locmem://                                    per process, for tests
+# Without CACHE_URL the file backend goes in /dev/shm, i.e. memory, when it exists.
+import tempfile
+
+CACHE_URL = os.getenv("CACHE_URL", "")
+
+if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+    _cache = {
+        'BACKEND': 'api.utils.cache_backends.InstrumentedRedisCache',
+        'LOCATION': CACHE_URL,
+    }
+elif CACHE_URL.startswith("locmem://"):
+    _cache = {
+        'BACKEND': 'api.utils.cache_backends.InstrumentedLocMemCache',
+    }
+else:
+    _shm = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    _cache = {
+        'BACKEND': 'api.utils.cache_backends.InstrumentedFileBasedCache',
+        'LOCATION': CACHE_URL[len("file://"):] if CACHE_URL.startswith("file://") else os.path.join(_shm, 'veritas_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+
+CACHES = {
+    'default': {
+        **_cache,
+        # Namespaces every key, so deployments can share one Redis
+        'KEY_PREFIX': os.getenv("CACHE_KEY_PREFIX", "veritas"),
+        'TIMEOUT': 300,
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
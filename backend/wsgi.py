@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 application = get_wsgi_application()
+
+# Only server processes refresh trending titles; with `gunicorn --preload` this is the
+# master alone, and forked workers read the snapshot it keeps on disk
+from api.trending_topics import trending_topics  # noqa: E402
+trending_topics.start()
+
+# With `gunicorn --preload` this runs once in the master, so forked workers
+# share the already-loaded recommender model instead of each unpickling it
+if os.getenv("RECOMMENDER_PRELOAD", "").lower() in ("1", "true", "yes"):
+    from api.utils.model_registry import recommender
+    recommender.load()